@@ -1,8 +1,10 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import (
     HeroSection, AboutSection, ServiceItem, ServicesSection,
     PortfolioSection, PartnerItem, PartnersSection,
-    ExampleVideo, ExamplesSection, ContactSection, FooterSection
+    ExampleVideo, ExamplesSection, ContactSection, FooterSection,
+    OutboundEmail
 )
 
 
@@ -152,9 +154,10 @@ class ExampleVideoAdmin(admin.ModelAdmin):
     list_filter = ['is_active']
     list_editable = ['order']
     ordering = ['order']
+    readonly_fields = ['video_id']
     fieldsets = [
         ('Content', {
-            'fields': ['youtube_url']
+            'fields': ['youtube_url', 'video_id', 'poster']
         }),
         ('Settings', {
             'fields': ['order', 'is_active']
@@ -197,3 +200,26 @@ class FooterSectionAdmin(admin.ModelAdmin):
             'fields': ['is_active']
         }),
     ]
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'to', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['status']
+    readonly_fields = ['created_at', 'sent_at', 'attempts', 'last_error']
+    actions = ['requeue']
+    fieldsets = [
+        ('Message', {
+            'fields': ['subject', 'from_email', 'to', 'body']
+        }),
+        ('Delivery', {
+            'fields': ['status', 'attempts', 'next_attempt_at', 'last_error', 'created_at', 'sent_at']
+        }),
+    ]
+
+    @admin.action(description='Requeue selected emails for immediate delivery')
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f'{updated} email(s) requeued.')
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class LitappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lit_app'
+
+    def ready(self):
+        # Keep the cached homepage snapshot in step with admin edits
+        from . import signals  # noqa: F401
+        # Tune SQLite connections as they are opened
+        from . import sqlite  # noqa: F401
@@ -0,0 +1,286 @@
+"""CSS/JS bundling for the public templates.
+
+Templates mark groups of local stylesheets or scripts with the ``bundle``
+block tag (``lit_app.templatetags.assets``)::
+
+    {% bundle 'site.css' %}
+      <link rel="stylesheet" href="{% static 'css/style.css' %}">
+      ...
+    {% endbundle %}
+
+``python manage.py build_assets`` finds those blocks, concatenates and
+minifies the referenced files in order into content-hashed files under
+``static/dist/`` and records them in ``static/dist/bundles.json``. When
+``settings.ASSET_BUNDLES`` is on and a bundle has been built, the tag emits a
+single ``<link>``/``<script>`` for it; otherwise the block renders unchanged.
+
+The same command extracts the *critical* CSS of the homepage: the rules of
+the local stylesheet bundles that can match the above-the-fold templates in
+``CRITICAL_TEMPLATES``. The ``deferred_styles`` tag inlines it and turns the
+stylesheet links it wraps into non-blocking preloads. Extraction only reads
+``static/css`` and the templates, so it runs offline.
+"""
+import functools
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path
+
+import rcssmin
+import rjsmin
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template.loader import get_template
+from django.template.utils import get_app_template_dirs
+from django.templatetags.static import static
+
+from .page_cache import build_version
+
+BUNDLE_DIR = 'dist'
+BUNDLE_MANIFEST = f'{BUNDLE_DIR}/bundles.json'
+
+BUNDLE_BLOCK_RE = re.compile(
+    r"{%\s*bundle\s+['\"](?P<name>[^'\"]+)['\"]\s*%}(?P<body>.*?){%\s*endbundle\s*%}", re.S,
+)
+STATIC_REF_RE = re.compile(r"{%\s*static\s+['\"](?P<path>[^'\"]+)['\"]\s*%}")
+COMMENT_RE = re.compile(r'<!--.*?-->|{#.*?#}|{%\s*comment\s*%}.*?{%\s*endcomment\s*%}', re.S)
+CSS_URL_RE = re.compile(r'url\(\s*(?P<quote>[\'"]?)(?P<url>.*?)(?P=quote)\s*\)')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_PRELUDE_RE = re.compile(r'(?P<prelude>[^{}]+){')
+SELECTOR_TOKEN_RE = re.compile(r'[.#](-?[_a-zA-Z][\w-]*)')
+SELECTOR_NOISE_RE = re.compile(r'::?[\w-]+(\([^)]*\))?|\[[^\]]*\]|[.#]-?[_a-zA-Z][\w-]*')
+ELEMENT_RE = re.compile(r'(?<![\w-])[a-zA-Z][\w-]*')
+HTML_TAG_RE = re.compile(r'<([a-zA-Z][\w-]*)')
+STYLESHEET_LINK_RE = re.compile(r'<link\b[^>]*\brel\s*=\s*["\']stylesheet["\'][^>]*>', re.I)
+STYLESHEET_REL_RE = re.compile(r'\brel\s*=\s*["\']stylesheet["\']', re.I)
+
+CRITICAL_BUNDLE = 'critical.css'
+CRITICAL_TEMPLATES = (
+    'base/base.html',
+    'components/beatlesmenu.html',
+    'components/hero.html',
+    'components/floatbutton.html',
+)
+# Elements present on every page even when no template spells them out
+ALWAYS_PRESENT_ELEMENTS = {'html', 'head', 'body'}
+
+
+def template_files():
+    """Every ``.html`` template in the project and app template directories."""
+    dirs = [Path(d) for engine in settings.TEMPLATES for d in engine.get('DIRS', [])]
+    dirs += [Path(d) for d in get_app_template_dirs('templates')]
+    for directory in dirs:
+        yield from sorted(directory.rglob('*.html'))
+
+
+def strip_comments(source):
+    return COMMENT_RE.sub('', source)
+
+
+def find_bundles():
+    """Map each bundle name to the static paths its template block references."""
+    bundles = {}
+    for path in template_files():
+        for match in BUNDLE_BLOCK_RE.finditer(strip_comments(path.read_text(encoding='utf-8'))):
+            name = match['name']
+            if name in bundles:
+                raise ValueError(f"Bundle '{name}' is declared more than once (again in {path})")
+            bundles[name] = [ref['path'] for ref in STATIC_REF_RE.finditer(match['body'])]
+    return bundles
+
+
+def is_local_url(url):
+    return bool(url) and not url.startswith(('data:', 'http:', 'https:', '//', '/', '#'))
+
+
+def rewrite_css_urls(css, source_path, target_dir):
+    """Re-point relative ``url()``s in ``css`` from ``source_path`` to ``target_dir``."""
+    def rewrite(match):
+        url = match['url']
+        if not is_local_url(url):
+            return match[0]
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(source_path), url))
+        return f'url("{posixpath.relpath(resolved, target_dir)}")'
+    return CSS_URL_RE.sub(rewrite, css)
+
+
+def build_bundle(name, paths):
+    """Return the minified contents of bundle ``name`` built from ``paths``."""
+    parts = []
+    for path in paths:
+        absolute = finders.find(path)
+        if absolute is None:
+            raise FileNotFoundError(f"Bundle '{name}' references missing static file '{path}'")
+        source = Path(absolute).read_text(encoding='utf-8')
+        if name.endswith('.css'):
+            parts.append(rcssmin.cssmin(rewrite_css_urls(source, path, BUNDLE_DIR), keep_bang_comments=True))
+        else:
+            # A file ending without a semicolon must not run into the next one
+            parts.append(rjsmin.jsmin(source, keep_bang_comments=True).rstrip().rstrip(';') + ';')
+    return '\n'.join(parts) + '\n'
+
+
+def hashed_bundle_name(name, content):
+    stem, ext = posixpath.splitext(name)
+    digest = hashlib.sha256(content.encode()).hexdigest()[:12]
+    return f'{BUNDLE_DIR}/{stem}.{digest}{ext}'
+
+
+def bundle_path(name):
+    """Static path of the built bundle ``name``, or None if it was never built.
+
+    Finding the manifest walks the static file finders, so it is looked up
+    once per build (see ``lit_app.page_cache.build_version``): a process
+    picks up bundles built after it started when it is restarted, or at
+    once if it ran ``build_assets`` itself.
+    """
+    return bundle_manifest(build_version()[0], tuple(map(str, settings.STATICFILES_DIRS))).get(name)
+
+
+@functools.cache
+def bundle_manifest(build, staticfiles_dirs):
+    manifest = finders.find(BUNDLE_MANIFEST)
+    if manifest is None:
+        return {}
+    with open(manifest, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def css_selectors(css):
+    """Selectors of every style rule in ``css`` (at-rule preludes excluded)."""
+    selectors = []
+    for match in CSS_PRELUDE_RE.finditer(CSS_COMMENT_RE.sub('', css)):
+        prelude = match['prelude'].strip().rsplit(';', 1)[-1].strip()
+        if prelude and not prelude.startswith('@'):
+            selectors.extend(s.strip() for s in prelude.split(',') if s.strip())
+    return selectors
+
+
+def unused_selectors(css, corpus_words):
+    """Selectors naming a class or id that never appears in ``corpus_words``.
+
+    Elements only ever created by scripts are covered by putting the bundled
+    JavaScript in the corpus as well as the templates.
+    """
+    return [
+        selector for selector in css_selectors(css)
+        if any(token not in corpus_words for token in SELECTOR_TOKEN_RE.findall(selector))
+    ]
+
+
+def referenced_static_paths():
+    """Static paths referenced by any template, outside comments."""
+    referenced = set()
+    for path in template_files():
+        source = strip_comments(path.read_text(encoding='utf-8'))
+        referenced.update(ref['path'] for ref in STATIC_REF_RE.finditer(source))
+    return referenced
+
+
+def orphaned_files(static_root, referenced, subdirs=('css', 'js')):
+    """CSS/JS files under ``static_root`` that no template references."""
+    static_root = Path(static_root)
+    orphans = []
+    for subdir in subdirs:
+        for path in sorted((static_root / subdir).rglob(f'*.{subdir}')):
+            relative = path.relative_to(static_root).as_posix()
+            if relative not in referenced:
+                orphans.append(relative)
+    return orphans
+
+
+def parse_rules(css):
+    """Split ``css`` into ``(prelude, body)`` pairs, matching nested braces."""
+    css = CSS_COMMENT_RE.sub('', css)
+    rules, start, depth, prelude = [], 0, 0, ''
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude, start = css[start:i], i + 1
+            depth += 1
+        elif char == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude.strip().rsplit(';', 1)[-1].strip(), css[start:i]))
+                start = i + 1
+    return rules
+
+
+def selector_matches(selector, words, elements):
+    """Whether ``selector`` could match markup containing ``words`` and ``elements``.
+
+    Every class, id and element named must occur; pseudo-classes and
+    attribute selectors are ignored, so ``a:hover`` counts wherever ``a`` does.
+    """
+    if not all(token in words for token in SELECTOR_TOKEN_RE.findall(selector)):
+        return False
+    return all(
+        element.lower() in elements for element in ELEMENT_RE.findall(SELECTOR_NOISE_RE.sub(' ', selector))
+    )
+
+
+def extract_critical_css(css, html):
+    """The rules of ``css`` that can apply to the markup in ``html``.
+
+    ``@media`` blocks are filtered recursively; fonts, keyframes and other
+    at-rules are left to the full stylesheets.
+    """
+    words = set(re.findall(r'[\w-]+', html))
+    elements = {tag.lower() for tag in HTML_TAG_RE.findall(html)} | ALWAYS_PRESENT_ELEMENTS
+    critical = []
+    for prelude, body in parse_rules(css):
+        if prelude.startswith('@media'):
+            inner = extract_critical_css(body, html)
+            if inner:
+                critical.append(f'{prelude}{{{inner}}}')
+        elif prelude and not prelude.startswith('@'):
+            selectors = [s.strip() for s in prelude.split(',') if s.strip()]
+            matching = [s for s in selectors if selector_matches(s, words, elements)]
+            if matching:
+                critical.append(f'{",".join(matching)}{{{body.strip()}}}')
+    return ''.join(critical)
+
+
+def critical_templates_source():
+    return ''.join(
+        strip_comments(Path(get_template(name).origin.name).read_text(encoding='utf-8'))
+        for name in CRITICAL_TEMPLATES
+    )
+
+
+_critical_cache = {}
+
+
+def critical_css(path):
+    """Contents of the built critical CSS at static ``path``, ready to inline.
+
+    ``url()``s written relative to the bundle directory become static URLs,
+    since inlined CSS resolves them against the page instead.
+    """
+    if path not in _critical_cache:
+        css = Path(finders.find(path)).read_text(encoding='utf-8')
+
+        def absolute(match):
+            url = match['url']
+            if not is_local_url(url):
+                return match[0]
+            name, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+            return f'url("{static(posixpath.normpath(posixpath.join(BUNDLE_DIR, name)))}{suffix}")'
+        _critical_cache[path] = CSS_URL_RE.sub(absolute, css)
+    return _critical_cache[path]
+
+
+def defer_stylesheets(html):
+    """Turn every stylesheet ``<link>`` in ``html`` into a non-blocking preload.
+
+    The link switches itself to a stylesheet once loaded; a ``<noscript>``
+    copy keeps the styles for visitors without JavaScript. Stylesheets still
+    cascade in document order, whichever finishes loading first.
+    """
+    def defer(match):
+        preload = STYLESHEET_REL_RE.sub(
+            'rel="preload" as="style" onload="this.onload=null;this.rel=\'stylesheet\'"', match[0], count=1,
+        )
+        return f'{preload}<noscript>{match[0]}</noscript>'
+    return STYLESHEET_LINK_RE.sub(defer, html)
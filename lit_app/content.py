@@ -0,0 +1,214 @@
+"""Homepage content snapshot.
+
+The homepage is assembled from a handful of singleton section models plus
+three ordered item lists. Rather than querying each of them on every hit,
+``get_snapshot()`` builds one read-only snapshot of everything ``index``
+needs and keeps it in Django's cache framework until an editor changes the
+content (see ``lit_app.signals``).
+
+Cached homepage data is keyed on a content version: a monotonically
+increasing Unix timestamp stored in the cache. Any content change bumps the
+version, which retires every snapshot and rendered page built for the
+previous one without having to know their keys.
+
+With a process-local cache (``CACHE_TIER=locmem``) a bump only reaches the
+worker that made it, so there the versions themselves expire after
+``CONTENT_CACHE_TIMEOUT`` (see ``version_timeout``): other workers pick up
+an edit within that long instead of never.
+
+Narrower caches are versioned the same way per scope (``section:<name>``,
+``images``, ``templates``; see ``get_scope_version``). Every worker reads
+the versions from the shared cache, so bumping one retires that scope
+everywhere; ``python manage.py clearcache`` does it by hand.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import (
+    HeroSection, AboutSection, ServiceItem, ServicesSection,
+    PortfolioSection, PartnerItem, PartnersSection,
+    ExampleVideo, ExamplesSection, ContactSection, FooterSection
+)
+from .profiling import record_cache
+
+CONTENT_VERSION_CACHE_KEY = 'lit_app:content_version'
+SCOPE_VERSION_CACHE_KEY = 'lit_app:version:{scope}'
+SNAPSHOT_CACHE_KEY = 'lit_app:homepage_snapshot:{version}'
+
+# Context name -> section model. Only the first active row is displayed.
+SECTION_MODELS = (
+    ('hero', HeroSection),
+    ('about', AboutSection),
+    ('services_header', ServicesSection),
+    ('portfolio', PortfolioSection),
+    ('partners_header', PartnersSection),
+    ('examples_header', ExamplesSection),
+    ('contact', ContactSection),
+    ('footer', FooterSection),
+)
+
+# Context name -> item model. Every active row is displayed, in Meta.ordering.
+ITEM_MODELS = (
+    ('services', ServiceItem),
+    ('partners', PartnerItem),
+    ('examples', ExampleVideo),
+)
+
+# Every model whose rows end up on the homepage.
+CONTENT_MODELS = tuple(model for _, model in SECTION_MODELS + ITEM_MODELS)
+
+# Context name of each content model, which also names its cache scope.
+SECTION_NAMES = {model: name for name, model in SECTION_MODELS + ITEM_MODELS}
+
+# Homepage fragment template -> context names it displays. Each fragment is
+# cached on its own (see lit_app.templatetags.fragments), so an edit only
+# re-renders the fragments that show the edited rows.
+HOMEPAGE_FRAGMENTS = {
+    'components/beatlesmenu.html': (),
+    'components/hero.html': ('hero',),
+    'components/floatbutton.html': (),
+    'components/carousel.html': (),
+    'sections/about.html': ('about',),
+    'sections/portfolio.html': ('portfolio',),
+    'sections/services.html': ('services_header', 'services'),
+    'sections/partners.html': ('partners_header', 'partners'),
+    'sections/examples.html': ('examples_header', 'examples'),
+    'pages/contactus.html': ('contact',),
+    'sections/footer.html': ('footer',),
+}
+
+# Below-the-fold homepage sections, by the name they are served under at
+# /sections/<name>/. With settings.LAZY_SECTIONS the homepage ships
+# placeholders for these and loads each one as it scrolls into view.
+LAZY_SECTIONS = {
+    'about': 'sections/about.html',
+    'portfolio': 'sections/portfolio.html',
+    'services': 'sections/services.html',
+    'partners': 'sections/partners.html',
+    'examples': 'sections/examples.html',
+    'contactus': 'pages/contactus.html',
+}
+
+
+def build_snapshot():
+    """Query every active section and item list straight from the database.
+
+    Item lists are materialized as tuples so the snapshot never holds a lazy
+    queryset that would hit the database again while the template renders.
+    """
+    snapshot = {
+        name: model.objects.filter(is_active=True).first()
+        for name, model in SECTION_MODELS
+    }
+    snapshot.update({
+        name: tuple(model.objects.filter(is_active=True))
+        for name, model in ITEM_MODELS
+    })
+    return snapshot
+
+
+async def abuild_snapshot():
+    """Async counterpart of ``build_snapshot`` using the async ORM."""
+    snapshot = {
+        name: await model.objects.filter(is_active=True).afirst()
+        for name, model in SECTION_MODELS
+    }
+    for name, model in ITEM_MODELS:
+        snapshot[name] = tuple([item async for item in model.objects.filter(is_active=True)])
+    return snapshot
+
+
+def version_timeout():
+    """Timeout for version keys: none, unless the cache is private to this process."""
+    if isinstance(caches['default'], LocMemCache):
+        return settings.CONTENT_CACHE_TIMEOUT
+    return None
+
+
+def get_content_version():
+    """Return the current content version, initializing it on a cold cache."""
+    version = cache.get(CONTENT_VERSION_CACHE_KEY)
+    record_cache('version', version is not None)
+    if version is None:
+        version = int(time.time())
+        # add() so concurrent workers settle on whichever value landed first
+        if not cache.add(CONTENT_VERSION_CACHE_KEY, version, version_timeout()):
+            version = cache.get(CONTENT_VERSION_CACHE_KEY, version)
+    return version
+
+
+async def aget_content_version():
+    """Async counterpart of ``get_content_version``."""
+    version = await cache.aget(CONTENT_VERSION_CACHE_KEY)
+    record_cache('version', version is not None)
+    if version is None:
+        version = int(time.time())
+        if not await cache.aadd(CONTENT_VERSION_CACHE_KEY, version, version_timeout()):
+            version = await cache.aget(CONTENT_VERSION_CACHE_KEY, version)
+    return version
+
+
+def bump_content_version(current=None):
+    """Advance the content version, retiring everything cached for the old one.
+
+    The new version is the current time, or one past ``current`` (the cached
+    version by default) if two changes land within the same second, so it
+    never goes backwards.
+    """
+    if current is None:
+        current = cache.get(CONTENT_VERSION_CACHE_KEY, 0)
+    version = max(int(time.time()), current + 1)
+    cache.set(CONTENT_VERSION_CACHE_KEY, version, version_timeout())
+    return version
+
+
+def get_scope_version(scope):
+    """Return the current version of cache ``scope``, initializing it on a cold cache."""
+    key = SCOPE_VERSION_CACHE_KEY.format(scope=scope)
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time())
+        if not cache.add(key, version, version_timeout()):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_scope_version(scope):
+    """Advance the version of cache ``scope``; see ``bump_content_version``."""
+    key = SCOPE_VERSION_CACHE_KEY.format(scope=scope)
+    version = max(int(time.time()), cache.get(key, 0) + 1)
+    cache.set(key, version, version_timeout())
+    return version
+
+
+def section_scope(name):
+    return f'section:{name}'
+
+
+def get_snapshot(version=None):
+    """Return the cached homepage snapshot, building it on a cold cache."""
+    if version is None:
+        version = get_content_version()
+    key = SNAPSHOT_CACHE_KEY.format(version=version)
+    snapshot = cache.get(key)
+    record_cache('snapshot', snapshot is not None)
+    if snapshot is None:
+        snapshot = build_snapshot()
+        cache.set(key, snapshot, settings.CONTENT_CACHE_TIMEOUT)
+    return snapshot
+
+
+async def aget_snapshot(version=None):
+    """Async counterpart of ``get_snapshot``."""
+    if version is None:
+        version = await aget_content_version()
+    key = SNAPSHOT_CACHE_KEY.format(version=version)
+    snapshot = await cache.aget(key)
+    record_cache('snapshot', snapshot is not None)
+    if snapshot is None:
+        snapshot = await abuild_snapshot()
+        await cache.aset(key, snapshot, settings.CONTENT_CACHE_TIMEOUT)
+    return snapshot
@@ -0,0 +1,286 @@
+"""Responsive derivatives for uploaded images.
+
+Every uploaded image is resized to the widths in ``DERIVATIVE_WIDTHS`` that
+are smaller than the original, each saved in the original format and as WebP
+next to the original under the field's ``upload_to`` folder::
+
+    services/cctv.jpg
+    services/cctv-480w.jpg
+    services/cctv-480w.webp
+    services/cctv-960w.jpg
+    ...
+
+Derivatives are generated when a model is saved (see ``lit_app.signals``) and
+in bulk by ``python manage.py generate_image_derivatives``. Existing files are
+left alone, so regeneration is idempotent; pass ``force=True`` to rebuild.
+Replacing an upload deletes the derivatives of the old one.
+Templates pick them up through the ``responsive_images`` tag library. Which
+derivatives exist is cached under the ``images`` scope version, bumped
+whenever derivatives are written.
+
+The same encoders back ``optimize_static_images``, which recompresses the
+images shipped in ``static/images``.
+"""
+import hashlib
+import posixpath
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models
+from PIL import Image, ImageOps
+
+from .content import get_scope_version
+from .publishing import atomic_write
+
+DERIVATIVE_WIDTHS = (480, 960, 1440)
+
+# Formats whose derivatives are also kept in the original format; anything
+# else (GIF, BMP...) only gets WebP derivatives.
+RESIZABLE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Uploaded-image derivatives, and optimize_static_images --quality; without
+# it static JPEGs keep their own quantization tables
+JPEG_QUALITY = 82
+JPEG_OPTIONS = {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True}
+PNG_OPTIONS = {'optimize': True}
+WEBP_OPTIONS = {'quality': 80, 'method': 6}
+
+DERIVATIVES_CACHE_KEY = 'lit_app:derivatives:{version}:{digest}'
+
+# EXIF Orientation, and the values of it that swap width and height
+ORIENTATION_TAG = 0x0112
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def derivative_name(name, width, ext=None):
+    """Storage name of the ``width`` derivative of ``name`` with extension ``ext``."""
+    root, original_ext = posixpath.splitext(name)
+    return f'{root}-{width}w{ext or original_ext}'
+
+
+def image_field_names(model):
+    return [field.name for field in model._meta.get_fields() if isinstance(field, models.ImageField)]
+
+
+def derivative_extensions(name):
+    extensions = ['.webp']
+    if posixpath.splitext(name)[1].lower() in RESIZABLE_EXTENSIONS:
+        extensions.insert(0, None)
+    return extensions
+
+
+def generate_derivatives(name, storage=None, force=False):
+    """Write the derivatives of the stored image ``name``; return the names written.
+
+    Only the header is read to tell which widths apply, so an image whose
+    derivatives all exist is never decoded.
+    """
+    storage = storage or default_storage
+    with storage.open(name) as f:
+        original = Image.open(f)
+        transposed = original.getexif().get(ORIENTATION_TAG) in TRANSPOSED_ORIENTATIONS
+        source_width = original.height if transposed else original.width
+        targets = [
+            (width, derivative_name(name, width, ext))
+            for width in DERIVATIVE_WIDTHS if width < source_width
+            for ext in derivative_extensions(name)
+        ]
+        if not force and all(storage.exists(target) for _, target in targets):
+            return []
+        original_format = original.format
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    written = []
+    for width, target in targets:
+        if storage.exists(target):
+            if not force:
+                continue
+            storage.delete(target)
+        resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        written.append(storage.save(target, ContentFile(encode(resized, target, original_format))))
+    return written
+
+
+def encode(image, name, original_format):
+    """Encode ``image`` for ``name``, stripping metadata along the way."""
+    buffer = BytesIO()
+    if name.endswith('.webp'):
+        image.save(buffer, 'WEBP', **WEBP_OPTIONS)
+    elif original_format == 'PNG':
+        image.save(buffer, 'PNG', **PNG_OPTIONS)
+    else:
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', **JPEG_OPTIONS)
+    return buffer.getvalue()
+
+
+def delete_derivatives(name, storage=None):
+    """Delete every derivative of the stored image ``name``; return the names deleted."""
+    storage = storage or default_storage
+    deleted = []
+    for width in DERIVATIVE_WIDTHS:
+        for ext in derivative_extensions(name):
+            target = derivative_name(name, width, ext)
+            if storage.exists(target):
+                storage.delete(target)
+                deleted.append(target)
+    return deleted
+
+
+def generate_instance_derivatives(instance, force=False):
+    """Generate derivatives for every populated ImageField on ``instance``."""
+    written = []
+    for field_name in image_field_names(type(instance)):
+        fieldfile = getattr(instance, field_name)
+        if fieldfile and fieldfile.storage.exists(fieldfile.name):
+            written.extend(generate_derivatives(fieldfile.name, fieldfile.storage, force))
+    return written
+
+
+def available_derivatives(fieldfile, ext=None):
+    """(url, width) pairs of the derivatives of ``fieldfile`` that exist in storage."""
+    if not fieldfile:
+        return []
+    # Hashed: upload names can exceed the key length some backends allow
+    digest = hashlib.md5(f'{fieldfile.name}:{ext}'.encode(), usedforsecurity=False).hexdigest()
+    key = DERIVATIVES_CACHE_KEY.format(version=get_scope_version('images'), digest=digest)
+    pairs = cache.get(key)
+    if pairs is None:
+        storage = fieldfile.storage
+        pairs = []
+        for width in DERIVATIVE_WIDTHS:
+            name = derivative_name(fieldfile.name, width, ext)
+            if storage.exists(name):
+                pairs.append((storage.url(name), width))
+        cache.set(key, pairs, settings.CONTENT_CACHE_TIMEOUT)
+    return pairs
+
+
+def _init_worker():
+    # Needed for the "spawn" start method; a no-op in forked workers
+    django.setup()
+
+
+def generate_all_derivatives(names, workers=None, force=False):
+    """Generate derivatives for many stored images in a process pool.
+
+    Yields ``(name, written, error)`` for each image as it completes; one
+    unreadable image does not stop the rest.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(generate_derivatives, name, force=force): name for name in names}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], [], e
+
+
+# Static image optimization (python manage.py optimize_static_images)
+
+STATIC_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def file_hash(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def avif_supported():
+    Image.init()
+    return 'AVIF' in Image.SAVE
+
+
+def optimize_static_image(path, jpeg_quality=None, dry_run=False):
+    """Recompress the image at ``path`` in place and write modern-format siblings.
+
+    PNGs are recompressed losslessly. JPEGs are re-encoded with their own
+    quantization tables and subsampling (Huffman-optimized, progressive),
+    or at ``jpeg_quality`` if given. A JPEG whose EXIF orientation would
+    have to be applied is left as it is, since its tables only fit the
+    untransposed pixels. Re-encoding drops EXIF/ICC/text metadata. The
+    recompressed file only replaces the original when it is smaller.
+
+    WebP (and AVIF, when this Pillow build supports it) siblings are named
+    after the whole file name (see ``sibling_path``), so ``logo.png`` and
+    ``logo.jpg`` do not share one. Returns a dict of byte sizes and hashes
+    for reporting.
+    """
+    path = Path(path)
+    original = path.read_bytes()
+    with Image.open(BytesIO(original)) as opened:
+        original_format = opened.format
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+        if original_format == 'PNG':
+            optimized = encode(image, path.name, 'PNG')
+        elif jpeg_quality is not None:
+            optimized = encode_jpeg(image, jpeg_quality)
+        elif original_format == 'JPEG' and opened.getexif().get(ORIENTATION_TAG, 1) == 1:
+            optimized = recompress_jpeg(opened)
+        else:
+            optimized = original
+    if len(optimized) >= len(original):
+        optimized = original
+
+    siblings = {'.webp': encode(image, '.webp', original_format)}
+    if avif_supported():
+        buffer = BytesIO()
+        image.save(buffer, 'AVIF', quality=60)
+        siblings['.avif'] = buffer.getvalue()
+
+    if not dry_run:
+        if optimized is not original:
+            atomic_write(path, optimized)
+        for ext, data in siblings.items():
+            atomic_write(sibling_path(path, ext), data)
+
+    return {
+        'path': str(path),
+        'original_size': len(original),
+        'optimized_size': len(optimized),
+        'sibling_sizes': {ext: len(data) for ext, data in siblings.items()},
+        'original_hash': hashlib.sha256(original).hexdigest(),
+        'hash': hashlib.sha256(optimized).hexdigest(),
+    }
+
+
+def sibling_path(path, ext):
+    """Where the ``ext`` (``.webp``/``.avif``) sibling of static image ``path`` goes."""
+    return path.with_name(path.name + ext)
+
+
+def recompress_jpeg(image):
+    """Re-encode JPEG ``image`` with its own quantization tables and subsampling."""
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality='keep', optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def encode_jpeg(image, quality):
+    buffer = BytesIO()
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    image.save(buffer, 'JPEG', **dict(JPEG_OPTIONS, quality=quality))
+    return buffer.getvalue()
+
+
+def optimize_static_images(paths, workers=None, **options):
+    """Run ``optimize_static_image`` over ``paths`` across CPU cores.
+
+    Yields ``(path, result, error)`` as each file completes.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(optimize_static_image, path, **options): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
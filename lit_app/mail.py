@@ -0,0 +1,163 @@
+"""Outbound mail queue for the contact form.
+
+``send_mail_view`` only records the submission as an ``OutboundEmail`` row;
+delivery happens out of band in ``python manage.py send_queued_mail``, which
+drains due messages over a single reused SMTP connection. A message that
+fails is retried with exponential backoff and, after
+``settings.MAIL_QUEUE_MAX_ATTEMPTS`` attempts, parked as a dead letter for an
+editor to inspect and requeue from the admin.
+
+Several workers (say, a cron run overlapping ``send_queued_mail --loop``)
+can drain the queue at once: each claims its batch by atomically pushing
+the rows' ``next_attempt_at`` out by ``CLAIM_LEASE`` before sending, so no
+row is handed to two of them. A worker that dies mid-batch leaves its
+unsent rows to be picked up again once the lease expires.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+# How long a claimed batch stays invisible to other workers; far longer than
+# sending it takes, short enough that a crashed worker's rows are retried
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+def compose_contact_email(data):
+    """Build the (subject, body) of the notification for a contact submission."""
+    name = data.get('name', '')
+    current_customer = data.get('currentcust', 'off')
+
+    subject = f'New Contact Form Submission from {name}'
+    body = f"""
+New contact form submission from LIVE i TECH website:
+
+Name: {name}
+Company: {data.get('company', '')}
+Title: {data.get('title', '')}
+Email: {data.get('email', '')}
+Phone: {data.get('phone', '')}
+
+Address: {data.get('address', '')}
+City: {data.get('city', '')}
+State: {data.get('state', '')}
+Zip Code: {data.get('zipcode', '')}
+
+System of Interest: {data.get('systemofinterest', '')}
+Current Customer: {'Yes' if current_customer == 'on' else 'No'}
+
+Comments:
+{data.get('message', '')}
+
+---
+This email was sent from the LIVE i TECH contact form.
+        """
+    return subject, body
+
+
+def queue_contact_email(data):
+    """Persist a contact submission to the outbox and return the queued row."""
+    subject, body = compose_contact_email(data)
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=settings.CONTACT_EMAIL,
+    )
+
+
+async def aqueue_contact_email(data):
+    """Async counterpart of ``queue_contact_email``."""
+    subject, body = compose_contact_email(data)
+    return await OutboundEmail.objects.acreate(
+        subject=subject,
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=settings.CONTACT_EMAIL,
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: base delay doubled per failed attempt."""
+    return timedelta(seconds=settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def deliver_queued_mail(batch_size=50):
+    """Send up to ``batch_size`` due messages and return (sent, failed) counts.
+
+    All messages in the batch share one connection. If the connection cannot
+    be opened at all, every message in the batch counts as a failed attempt.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        for outbound in batch:
+            record_failure(outbound, e)
+        return 0, len(batch)
+
+    try:
+        for outbound in batch:
+            message = EmailMessage(
+                subject=outbound.subject,
+                body=outbound.body,
+                from_email=outbound.from_email,
+                to=[outbound.to],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as e:
+                record_failure(outbound, e)
+                failed += 1
+            else:
+                outbound.status = OutboundEmail.STATUS_SENT
+                outbound.attempts += 1
+                outbound.sent_at = timezone.now()
+                outbound.last_error = ''
+                outbound.save(update_fields=['status', 'attempts', 'sent_at', 'last_error', 'updated_at'])
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def claim_batch(batch_size):
+    """Claim up to ``batch_size`` due messages for this worker and return them.
+
+    A row is only claimed if its ``next_attempt_at`` is still the value that
+    was read, so of two workers racing for it exactly one update matches.
+    """
+    now = timezone.now()
+    due = (
+        OutboundEmail.objects
+        .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'pk')[:batch_size]
+    )
+    batch = []
+    for outbound in due:
+        claimed = OutboundEmail.objects.filter(
+            pk=outbound.pk, status=OutboundEmail.STATUS_PENDING, next_attempt_at=outbound.next_attempt_at,
+        ).update(next_attempt_at=now + CLAIM_LEASE)
+        if claimed:
+            batch.append(outbound)
+    return batch
+
+
+def record_failure(outbound, error):
+    """Schedule a retry for ``outbound``, or dead-letter it when out of attempts."""
+    outbound.attempts += 1
+    outbound.last_error = f'{type(error).__name__}: {error}'
+    if outbound.attempts >= settings.MAIL_QUEUE_MAX_ATTEMPTS:
+        outbound.status = OutboundEmail.STATUS_DEAD
+    else:
+        outbound.next_attempt_at = timezone.now() + retry_delay(outbound.attempts)
+    outbound.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'updated_at'])
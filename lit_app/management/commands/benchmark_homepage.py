@@ -0,0 +1,223 @@
+import gzip
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template import engines
+from django.template.loader import get_template
+from django.test import Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+from django.urls import reverse
+
+from lit_app.content import (
+    SECTION_NAMES, bump_content_version, bump_scope_version, get_content_version, get_snapshot,
+    section_scope
+)
+from lit_app.mail import deliver_queued_mail
+from lit_app.page_cache import _rendered_pages
+from lit_app.template_loaders import INCLUDE_RE
+
+# A private cache so a run never evicts or bumps the real site's entries;
+# uploads, derivatives and published pages go to a temporary directory
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lit-app-benchmark',
+    },
+}
+
+CONTACT_POST = {
+    'name': 'Benchmark Visitor',
+    'email': 'visitor@example.com',
+    'phone': '555-0100',
+    'company': 'Example Inc.',
+    'systemofinterest': 'CCTV',
+    'message': 'Please get in touch about a site survey.',
+}
+
+
+def percentiles(samples):
+    """Summary of latency ``samples`` (seconds) in milliseconds."""
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))] * 1000
+
+    return {
+        'n': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': at(0.50),
+        'p90_ms': at(0.90),
+        'p99_ms': at(0.99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def flatten(results, prefix=''):
+    """Numeric leaves of a results dict keyed by dotted path."""
+    flat = {}
+    for key, value in results.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{path}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def retire_everything():
+    """What ``clearcache --all`` does, with templates recompiled right away."""
+    for scope in [section_scope(name) for name in SECTION_NAMES.values()] + ['images', 'templates']:
+        bump_scope_version(scope)
+    bump_content_version(get_content_version())
+    # The loader only checks the templates version once a second
+    for loader in engines['django'].engine.template_loaders:
+        if hasattr(loader, 'reset'):
+            loader.reset()
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the homepage and contact form against a seeded throwaway database; write JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per latency measurement (default: 200)')
+        parser.add_argument('--cold', type=int, default=20, help='Uncached homepage renders to time (default: 20)')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument('--compare', help='Earlier JSON results to print percentage changes against')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['cold'] < 1:
+            raise CommandError('--requests and --cold must be at least 1')
+        baseline = json.loads(Path(options['compare']).read_text()) if options['compare'] else None
+
+        setup_test_environment()  # locmem email backend, "testserver" host
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                CACHES=BENCHMARK_CACHES, MEDIA_ROOT=media_root,
+                PUBLISH_ROOT=str(Path(media_root) / 'published'),
+            ):
+                _rendered_pages.clear()
+                call_command('populate_content', stdout=StringIO())
+                results = self.run_benchmarks(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            _rendered_pages.clear()
+
+        output = json.dumps(results, indent=2) + '\n'
+        if options['output']:
+            Path(options['output']).write_text(output)
+            self.stderr.write(f'Results written to {options["output"]}')
+        else:
+            self.stdout.write(output)
+        if baseline is not None:
+            self.report_changes(baseline, results)
+
+    def run_benchmarks(self, options):
+        client = Client()
+        index_url = reverse('index')
+
+        # Cold: every request compiles the templates and renders every fragment
+        cold = []
+        for _ in range(options['cold']):
+            retire_everything()
+            start = time.perf_counter()
+            client.get(index_url, secure=True)
+            cold.append(time.perf_counter() - start)
+        retire_everything()
+        with CaptureQueriesContext(connection) as cold_queries:
+            response = client.get(index_url, secure=True)
+        # Read counts now: each request_started clears the connection's query log
+        queries = {'cold': len(cold_queries)}
+        content = response.content
+
+        warm = []
+        for _ in range(options['requests']):
+            start = time.perf_counter()
+            client.get(index_url, secure=True)
+            warm.append(time.perf_counter() - start)
+        with CaptureQueriesContext(connection) as warm_queries:
+            client.get(index_url, secure=True)
+        queries['warm'] = len(warm_queries)
+
+        mail_latency = []
+        for _ in range(options['requests']):
+            start = time.perf_counter()
+            client.post(reverse('send_mail'), CONTACT_POST, secure=True)
+            mail_latency.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        sent, failed = deliver_queued_mail(batch_size=options['requests'])
+        drain = time.perf_counter() - start
+
+        return {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'debug': settings.DEBUG,
+                'async_views': settings.ASYNC_VIEWS,
+                'requests': options['requests'],
+                'cold_requests': options['cold'],
+            },
+            'index': {
+                'cold': percentiles(cold),
+                'warm': percentiles(warm),
+                'queries': queries,
+                'bytes': {'raw': len(content), 'gzip': len(gzip.compress(content))},
+            },
+            'sections_render_ms': self.time_sections(),
+            'send_mail': {
+                'request': percentiles(mail_latency),
+                'drain': {'sent': sent, 'failed': failed, 'total_ms': drain * 1000},
+            },
+        }
+
+    def time_sections(self, rounds=20):
+        """Mean render time of each template ``pages/index.html`` includes."""
+        source = Path(get_template('pages/index.html').origin.name).read_text(encoding='utf-8')
+        names = [match['name'] for match in INCLUDE_RE.finditer(source) if match['name']]
+        context = get_snapshot()
+        timings = {}
+        for name in names:
+            template = get_template(name)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                template.render(context)
+            timings[name] = (time.perf_counter() - start) / rounds * 1000
+        return timings
+
+    def report_changes(self, baseline, results):
+        before, after = flatten(baseline), flatten(results)
+        self.stderr.write(f'Changes against {baseline.get("meta", {}).get("git_revision") or "baseline"}:')
+        for path, value in after.items():
+            if path.startswith('meta.') or path.endswith('.n') or path not in before:
+                continue
+            old = before[path]
+            change = f'{(value - old) / old * 100:+.1f}%' if old else 'n/a'
+            self.stderr.write(f'  {path}: {old:.3f} -> {value:.3f} ({change})')
@@ -0,0 +1,120 @@
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+)
+
+from lit_app.content import build_snapshot
+from lit_app.management.commands.benchmark_homepage import BENCHMARK_CACHES, percentiles
+from lit_app.models import AboutSection, ServiceItem
+
+
+class Command(BaseCommand):
+    help = 'Compare homepage reader throughput on SQLite with and without SQLITE_PRODUCTION during admin saves'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=5, help='Seconds per configuration (default: 5)')
+        parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads (default: 4)')
+        parser.add_argument('--writers', type=int, default=1, help='Concurrent admin-save threads (default: 1)')
+        parser.add_argument(
+            '--hold', type=float, default=0.02,
+            help='Seconds each save keeps its transaction open, like a slow admin form (default: 0.02)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('benchmark_sqlite needs the default database to be SQLite')
+        if options['readers'] < 1:
+            raise CommandError('--readers must be at least 1')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # WAL only applies to a database file, so avoid the in-memory test database
+            connection.settings_dict['TEST']['NAME'] = str(Path(tmp) / 'benchmark.sqlite3')
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                with override_settings(CACHES=BENCHMARK_CACHES):
+                    call_command('populate_content', stdout=StringIO())
+                    results = {
+                        'default': self.run_mode(False, options),
+                        'SQLITE_PRODUCTION': self.run_mode(True, options),
+                    }
+            finally:
+                connections.close_all()
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        self.stdout.write(
+            f'{options["readers"]} reader(s), {options["writers"]} writer(s) holding '
+            f'{options["hold"] * 1000:g} ms, {options["duration"]:g}s per configuration'
+        )
+        for label, result in results.items():
+            latency = result['read_latency']
+            self.stdout.write(
+                f'  {label:<18} {result["reads"] / options["duration"]:8.1f} snapshots/s  '
+                f'p50 {latency["p50_ms"]:.2f} ms  p99 {latency["p99_ms"]:.2f} ms  max {latency["max_ms"]:.1f} ms  '
+                f'saves {result["saves"]}  locked errors {result["errors"]}'
+            )
+        before, after = (result['reads'] for result in results.values())
+        self.stdout.write(self.style.SUCCESS(f'Reader throughput change: {(after - before) / before * 100:+.1f}%'))
+
+    def run_mode(self, tuned, options):
+        with override_settings(SQLITE_PRODUCTION=tuned):
+            connections.close_all()
+            if not tuned:
+                # journal_mode sticks to the file; start from SQLite's default
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode = DELETE')
+                connections.close_all()
+
+            deadline = time.monotonic() + options['duration']
+            lock = threading.Lock()
+            result = {'reads': 0, 'saves': 0, 'errors': 0, 'latency': []}
+
+            def worker(work):
+                try:
+                    while time.monotonic() < deadline:
+                        try:
+                            work()
+                        except OperationalError:
+                            with lock:
+                                result['errors'] += 1
+                finally:
+                    connection.close()
+
+            def read():
+                start = time.perf_counter()
+                build_snapshot()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    result['reads'] += 1
+                    result['latency'].append(elapsed)
+
+            def save():
+                # An admin change form: the section and its inline items in one transaction
+                with transaction.atomic():
+                    about = AboutSection.objects.first()
+                    about.save()
+                    for item in ServiceItem.objects.all():
+                        item.save()
+                    time.sleep(options['hold'])
+                with lock:
+                    result['saves'] += 1
+
+            threads = [threading.Thread(target=worker, args=(read,)) for _ in range(options['readers'])]
+            threads += [threading.Thread(target=worker, args=(save,)) for _ in range(options['writers'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        result['read_latency'] = percentiles(result.pop('latency'))
+        return result
@@ -0,0 +1,51 @@
+import re
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from lit_app.rich_text import strip_outer_wrapper
+from lit_app.templatetags.strip_paragraphs import strip_outer_p
+
+# The filter's original implementation, kept for comparison
+LEGACY_PATTERN = r'^\s*<(p|div)(?:\s+[^>]*)?>([\s\S]*?)</\1>\s*$'
+
+
+def legacy_strip_outer_p(value):
+    match = re.match(LEGACY_PATTERN, str(value), flags=re.IGNORECASE)
+    return match.group(2) if match else value
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark strip_outer_p against its original regex implementation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=1000, help='Calls per measurement (default: 1000)')
+        parser.add_argument(
+            '--hostile-size', type=int, default=5000,
+            help='Whitespace run in the unterminated-tag input (default: 5000; the legacy regex is quadratic in it)',
+        )
+
+    def handle(self, *args, **options):
+        number = options['number']
+        inputs = {
+            'subtitle': '<p>Security Systems | Networked Systems | Service | Design</p>',
+            'body (50 KB)': '<div>' + '<p>Lorem <strong>ipsum</strong> dolor sit amet.</p>\n' * 1000 + '</div>',
+            'sibling paragraphs': '<p>One</p>' * 200 + '<p>Two</p>',
+            f'unterminated tag ({options["hostile_size"]})': '<p' + ' ' * options['hostile_size'] + 'x>',
+        }
+        implementations = {
+            'legacy regex': legacy_strip_outer_p,
+            'scanner': strip_outer_wrapper,
+            'filter (memo)': strip_outer_p,
+        }
+
+        self.stdout.write(f'{"input":<28}' + ''.join(f'{name:>16}' for name in implementations))
+        for label, value in inputs.items():
+            # The hostile input takes seconds per call with the legacy regex
+            calls = 1 if label.startswith('unterminated') else number
+            row = f'{label:<28}'
+            for function in implementations.values():
+                seconds = timeit.timeit(lambda: function(value), number=calls)
+                row += f'{seconds / calls * 1e6:>13.1f} us'
+            self.stdout.write(row)
+        self.stdout.write(self.style.SUCCESS(f'Mean per-call times over {number} call(s), one for the unterminated tag.'))
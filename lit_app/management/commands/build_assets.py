@@ -0,0 +1,87 @@
+import json
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+
+from lit_app.assets import (
+    BUNDLE_DIR, BUNDLE_MANIFEST, CRITICAL_BUNDLE, build_bundle, bundle_manifest, critical_templates_source,
+    extract_critical_css, find_bundles, hashed_bundle_name, orphaned_files, referenced_static_paths,
+    template_files, unused_selectors
+)
+from lit_app.content import bump_content_version
+from lit_app.publishing import atomic_write
+
+
+class Command(BaseCommand):
+    help = 'Build hashed, minified {% bundle %} files and the critical homepage CSS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--root',
+            default=str(settings.STATICFILES_DIRS[0]),
+            help='Directory to write dist/ into (default: static)',
+        )
+        parser.add_argument('--report', action='store_true', help='List every unused selector and orphaned file')
+
+    def handle(self, *args, **options):
+        root = Path(options['root'])
+        dist = root / BUNDLE_DIR
+        dist.mkdir(parents=True, exist_ok=True)
+
+        manifest, contents = {}, {}
+        for name, paths in find_bundles().items():
+            content = build_bundle(name, paths)
+            original = sum(Path(finders.find(path)).stat().st_size for path in paths)
+            target = hashed_bundle_name(name, content)
+            atomic_write(root / target, content.encode())
+            manifest[name] = target
+            contents[name] = content
+            self.stdout.write(
+                f'  [OK] {target}: {len(paths)} file(s), {original:,} -> {len(content.encode()):,} bytes'
+            )
+
+        # Above-the-fold rules of the local stylesheets, inlined by {% deferred_styles %}
+        styles = ''.join(content for name, content in contents.items() if name.endswith('.css'))
+        if styles:
+            critical = extract_critical_css(styles, critical_templates_source()) + '\n'
+            manifest[CRITICAL_BUNDLE] = hashed_bundle_name(CRITICAL_BUNDLE, critical)
+            atomic_write(root / manifest[CRITICAL_BUNDLE], critical.encode())
+            self.stdout.write(f'  [OK] {manifest[CRITICAL_BUNDLE]}: {len(critical.encode()):,} bytes of critical CSS')
+
+        # Drop bundles left behind by earlier builds
+        current = {Path(target).name for target in manifest.values()}
+        for path in dist.iterdir():
+            if path.suffix in ('.css', '.js') and path.name not in current:
+                path.unlink()
+        atomic_write(root / BUNDLE_MANIFEST, (json.dumps(manifest, indent=2, sort_keys=True) + '\n').encode())
+        bundle_manifest.cache_clear()
+        # Cached pages may point at the bundles just removed
+        bump_content_version()
+
+        self.report_unused_selectors(contents, options['report'])
+        self.report_orphans(options['report'])
+        self.stdout.write(self.style.SUCCESS(f'{len(manifest)} bundle(s) built.'))
+
+    def report_unused_selectors(self, contents, verbose):
+        corpus = ''.join(path.read_text(encoding='utf-8') for path in template_files())
+        corpus += ''.join(content for name, content in contents.items() if name.endswith('.js'))
+        words = set(re.findall(r'[\w-]+', corpus))
+        for name, content in contents.items():
+            if not name.endswith('.css'):
+                continue
+            unused = unused_selectors(content, words)
+            self.stdout.write(self.style.WARNING(f'{name}: {len(unused)} selector(s) match nothing in the templates'))
+            if verbose:
+                for selector in unused:
+                    self.stdout.write(f'  {selector}')
+
+    def report_orphans(self, verbose):
+        referenced = referenced_static_paths()
+        orphans = [path for root in settings.STATICFILES_DIRS for path in orphaned_files(root, referenced)]
+        self.stdout.write(self.style.WARNING(f'{len(orphans)} CSS/JS file(s) are not referenced by any template'))
+        if verbose:
+            for path in orphans:
+                self.stdout.write(f'  {path}')
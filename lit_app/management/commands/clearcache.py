@@ -1,9 +1,65 @@
-from django.core.management.base import BaseCommand
-from django.core.cache import cache
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from lit_app.content import (
+    LAZY_SECTIONS, SECTION_NAMES, bump_content_version, bump_scope_version, get_snapshot, section_scope
+)
+from lit_app.page_cache import get_rendered_page
 
 class Command(BaseCommand):
-    help = 'Clears the entire cache'
+    help = (
+        'Retire cached homepage content for every worker by bumping cache versions; '
+        'scope it with --section/--images/--templates or take everything with --all'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--section', action='append', default=[], choices=sorted(SECTION_NAMES.values()),
+            help='Retire one section\'s cached fragments (repeatable)',
+        )
+        parser.add_argument('--images', action='store_true', help='Retire cached image derivative listings')
+        parser.add_argument('--templates', action='store_true', help='Make every worker recompile its templates')
+        parser.add_argument('--all', action='store_true', help='All of the above, for every section')
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Rebuild the homepage snapshot, rendered page and lazy sections right away',
+        )
+
+    def handle(self, *args, **options):
+        if options['all'] and (options['section'] or options['images'] or options['templates']):
+            raise CommandError('--all already includes --section, --images and --templates')
+
+        if settings.CACHE_TIER == 'locmem':
+            self.stdout.write(self.style.WARNING(
+                'CACHE_TIER is locmem: running workers keep their own caches and will not see this'
+            ))
+
+        scopes = [section_scope(name) for name in options['section']]
+        if options['images']:
+            scopes.append('images')
+        if options['templates']:
+            scopes.append('templates')
+        if options['all']:
+            scopes = [section_scope(name) for name in sorted(SECTION_NAMES.values())] + ['images', 'templates']
+
+        for scope in scopes:
+            bump_scope_version(scope)
+            self.stdout.write(f'  retired {scope}')
+        # The page embeds every scope, so it is always retired. Workers keep
+        # their in-process page under the version it was rendered for, so
+        # each one moves on once it reads the new version on its next request
+        version = bump_content_version()
+        self.stdout.write(f'  retired homepage snapshot and pages (now version {version})')
 
-    def handle(self, *args, **kwargs):
-        cache.clear()
+        if options['warm']:
+            get_snapshot(version)
+            get_rendered_page('pages/index.html', version)
+            if settings.LAZY_HOMEPAGE:
+                get_rendered_page('pages/index_lazy.html', version)
+                # Served from /sections/<name>/ as visitors scroll
+                for template_name in LAZY_SECTIONS.values():
+                    get_rendered_page(template_name, version)
+                self.stdout.write('  warmed homepage snapshot, pages and sections')
+            else:
+                self.stdout.write('  warmed homepage snapshot and page')
         self.stdout.write(self.style.SUCCESS('Cache cleared successfully.'))
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+from lit_app.content import bump_content_version
+
+SOURCE_ALIAS = 'sqlite_source'
+
+
+@contextmanager
+def sqlite_database(path, alias=SOURCE_ALIAS):
+    """Make the SQLite file ``path`` usable as database ``alias`` until the block exits."""
+    if alias in connections.settings:
+        raise CommandError(f'Database alias "{alias}" is already configured')
+    connections.settings[alias] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: dict(connections.settings[DEFAULT_DB_ALIAS]),
+        alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path)},
+    })[alias]
+    try:
+        yield connections[alias]
+    finally:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+class Command(BaseCommand):
+    help = 'Copy every lit_app row from a SQLite file into the DATABASE_URL database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', default=str(settings.BASE_DIR / 'db.sqlite3'),
+            help='SQLite file to copy from (default: db.sqlite3)',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database alias to copy into; it must already be migrated (default: "default")',
+        )
+        parser.add_argument('--replace', action='store_true', help='Delete existing lit_app rows in the target first')
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        if not source.is_file():
+            raise CommandError(f'{source} does not exist')
+        target = options['database']
+        if connections[target].vendor == 'sqlite' and Path(connections[target].settings_dict['NAME']) == source:
+            raise CommandError('The source and target are the same database; set DATABASE_URL to the new one')
+
+        with sqlite_database(source):
+            for alias in (SOURCE_ALIAS, target):
+                self.check_migrated(alias)
+            copied = self.copy(target, options)
+
+        # Nothing cached for the old database describes the new one
+        bump_content_version()
+        for label, count in copied.items():
+            self.stdout.write(f'  {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Copied {sum(copied.values())} row(s) from {source}.'))
+
+    def check_migrated(self, alias):
+        executor = MigrationExecutor(connections[alias])
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            name = connections[alias].settings_dict['NAME']
+            raise CommandError(f'{name} has unapplied migrations; run "python manage.py migrate" against it first')
+
+    def copy(self, target, options):
+        models = list(apps.get_app_config('lit_app').get_models())
+        copied = {}
+        with transaction.atomic(using=target):
+            for model in models:
+                existing = model._default_manager.using(target)
+                if options['replace']:
+                    existing.all().delete()
+                elif existing.exists():
+                    raise CommandError(
+                        f'{model._meta.label} already has rows in "{target}"; pass --replace to overwrite them'
+                    )
+                rows = list(model._default_manager.using(SOURCE_ALIAS).order_by('pk'))
+                for row in rows:
+                    # Raw, as when loading a fixture: field pre_save hooks would
+                    # stamp auto_now/auto_now_add timestamps with the copy time
+                    # and re-render the *_html columns instead of copying them
+                    row.save_base(raw=True, force_insert=True, using=target)
+                copied[model._meta.label] = len(rows)
+
+            # Explicit primary keys leave PostgreSQL sequences behind the copied rows
+            connection = connections[target]
+            statements = connection.ops.sequence_reset_sql(no_style(), models)
+            if statements:
+                with connection.cursor() as cursor:
+                    for sql in statements:
+                        cursor.execute(sql)
+        return copied
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from lit_app.models import ExampleVideo
+from lit_app.youtube import store_poster
+
+
+class Command(BaseCommand):
+    help = 'Fetch a poster from YouTube for every example video without one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Fetch posters that were fetched before again (uploaded posters are kept)',
+        )
+
+    def handle(self, *args, **options):
+        total = errors = 0
+        for video in ExampleVideo.objects.order_by('order', 'pk'):
+            if not video.video_id:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f'  [ERROR] {video}: not a YouTube video URL'))
+                continue
+            try:
+                # Saving the poster re-renders the section and generates its derivatives
+                stored = store_poster(video, options['force'])
+            except OSError as e:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f'  [ERROR] {video}: {e}'))
+                continue
+            if stored:
+                total += 1
+                self.stdout.write(f'  [OK] {video}: {video.poster.name}')
+            else:
+                self.stdout.write(self.style.WARNING(f'  [SKIP] {video}: has a poster'))
+        self.stdout.write(self.style.SUCCESS(f'{total} poster(s) fetched, {errors} error(s).'))
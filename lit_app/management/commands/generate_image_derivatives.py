@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from lit_app.content import CONTENT_MODELS, bump_content_version, bump_scope_version
+from lit_app.images import generate_all_derivatives, image_field_names
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive width/WebP derivatives for every uploaded image'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+        parser.add_argument('--force', action='store_true', help='Rebuild derivatives that already exist')
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in CONTENT_MODELS:
+            for field_name in image_field_names(model):
+                names.update(
+                    model.objects.exclude(**{field_name: ''}).values_list(field_name, flat=True)
+                )
+
+        self.stdout.write(f'Processing {len(names)} image(s)...')
+        total = errors = 0
+        for name, written, error in generate_all_derivatives(sorted(names), options['workers'], options['force']):
+            if error is not None:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f'  [ERROR] {name}: {error}'))
+            elif written:
+                total += len(written)
+                self.stdout.write(f'  [OK] {name}: {len(written)} derivative(s)')
+            else:
+                self.stdout.write(self.style.WARNING(f'  [SKIP] {name}: up to date'))
+
+        if total:
+            # Re-render cached pages so they reference the new derivatives
+            bump_scope_version('images')
+            bump_content_version()
+        self.stdout.write(self.style.SUCCESS(f'{total} derivative(s) written, {errors} error(s).'))
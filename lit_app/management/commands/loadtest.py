@@ -0,0 +1,146 @@
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin, urlsplit
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lit_app.management.commands.benchmark_homepage import CONTACT_POST, percentiles
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+
+class Command(BaseCommand):
+    help = 'Drive concurrent homepage GETs and contact form POSTs at a running server and report latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/', help='Site root (default: http://127.0.0.1:8000/)')
+        parser.add_argument('--concurrency', type=int, default=10, help='Concurrent clients (default: 10)')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run (default: 30)')
+        parser.add_argument(
+            '--post-ratio', type=float, default=0.2,
+            help='Fraction of requests that POST the contact form (default: 0.2)',
+        )
+        parser.add_argument('--timeout', type=float, default=10, help='Per-request timeout in seconds (default: 10)')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+        parser.add_argument(
+            '--allow-remote', action='store_true',
+            help='Allow a non-local --url (every POST queues a real email)',
+        )
+
+    def handle(self, *args, **options):
+        base_url = options['url'].rstrip('/') + '/'
+        if urlsplit(base_url).hostname not in LOCAL_HOSTS and not options['allow_remote']:
+            raise CommandError(f'{base_url} is not local; pass --allow-remote if you really mean it')
+
+        cookie, token = self.csrf_credentials(base_url, options['timeout'])
+        post_body = urlencode(dict(CONTACT_POST, csrfmiddlewaretoken=token)).encode()
+        post_headers = {
+            'Cookie': f'csrftoken={cookie}',
+            'Referer': base_url,
+            'Content-Type': 'application/x-www-form-urlencoded',
+        }
+
+        samples = defaultdict(list)  # endpoint -> [(seconds, outcome)]
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def client():
+            while time.monotonic() < deadline:
+                if random.random() < options['post_ratio']:
+                    endpoint = 'POST /send-mail/'
+                    request = Request(urljoin(base_url, 'send-mail/'), post_body, post_headers)
+                else:
+                    endpoint = 'GET /'
+                    request = Request(base_url)
+                seconds, outcome = self.timed_request(request, options['timeout'])
+                with lock:
+                    samples[endpoint].append((seconds, outcome))
+
+        self.stderr.write(
+            f'Running {options["concurrency"]} client(s) against {base_url} for {options["duration"]:g}s...'
+        )
+        started = time.monotonic()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            for _ in range(options['concurrency']):
+                pool.submit(client)
+        report = self.build_report(samples, time.monotonic() - started, options)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+
+    def csrf_credentials(self, base_url, timeout):
+        """CSRF cookie and token, fetched the way the contact form script does."""
+        url = urljoin(base_url, 'csrf-token/')
+        try:
+            with urlopen(url, timeout=timeout) as response:
+                token = json.loads(response.read())['token']
+                cookies = SimpleCookie()
+                for header in response.headers.get_all('Set-Cookie') or []:
+                    cookies.load(header)
+        except (HTTPError, URLError, ValueError, KeyError) as e:
+            raise CommandError(f'Could not get a CSRF token from {url}: {e!r}')
+        if 'csrftoken' not in cookies:
+            raise CommandError(f'{url} did not set a CSRF cookie')
+        return cookies['csrftoken'].value, token
+
+    def timed_request(self, request, timeout):
+        """(seconds, outcome) for one request; outcome is a status code or error name."""
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                response.read()
+                outcome = response.status
+        except HTTPError as e:
+            outcome = e.code
+        except (URLError, OSError) as e:
+            outcome = type(getattr(e, 'reason', e)).__name__
+        return time.perf_counter() - start, outcome
+
+    def build_report(self, samples, elapsed, options):
+        endpoints = {}
+        for endpoint, results in sorted(samples.items()):
+            outcomes = Counter(str(outcome) for _, outcome in results)
+            errors = sum(count for outcome, count in outcomes.items() if not outcome.startswith('2'))
+            endpoints[endpoint] = {
+                'requests': len(results),
+                'throughput_rps': len(results) / elapsed,
+                'error_rate': errors / len(results),
+                'outcomes': dict(outcomes),
+                'latency': percentiles([seconds for seconds, _ in results]),
+            }
+        total = sum(endpoint['requests'] for endpoint in endpoints.values())
+        return {
+            'url': options['url'],
+            'concurrency': options['concurrency'],
+            'elapsed_s': elapsed,
+            'requests': total,
+            'throughput_rps': total / elapsed,
+            'endpoints': endpoints,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f'{report["requests"]} request(s) in {report["elapsed_s"]:.1f}s '
+            f'({report["throughput_rps"]:.1f} req/s, {report["concurrency"]} client(s))'
+        )
+        for endpoint, stats in report['endpoints'].items():
+            latency = stats['latency']
+            style = self.style.ERROR if stats['error_rate'] else self.style.SUCCESS
+            self.stdout.write(style(
+                f'  {endpoint}: {stats["requests"]} req, {stats["throughput_rps"]:.1f} req/s, '
+                f'errors {stats["error_rate"]:.1%}'
+            ))
+            self.stdout.write(
+                f'    p50 {latency["p50_ms"]:.1f} ms, p90 {latency["p90_ms"]:.1f} ms, '
+                f'p99 {latency["p99_ms"]:.1f} ms, max {latency["max_ms"]:.1f} ms'
+            )
+            self.stdout.write(f'    outcomes: {", ".join(f"{k}={v}" for k, v in sorted(stats["outcomes"].items()))}')
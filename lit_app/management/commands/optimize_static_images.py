@@ -0,0 +1,96 @@
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lit_app.images import (
+    STATIC_IMAGE_EXTENSIONS, avif_supported, file_hash, optimize_static_images, sibling_path
+)
+
+MANIFEST_NAME = '.optimize-manifest.json'
+
+
+class Command(BaseCommand):
+    help = 'Recompress static JPG/PNG images, write WebP/AVIF siblings and report duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(Path(settings.STATICFILES_DIRS[0]) / 'images'),
+            help='Directory to optimize (default: static/images)',
+        )
+        parser.add_argument(
+            '--quality', type=int,
+            help='Re-encode JPEGs at this quality (lossy; default: keep each file\'s own quality)',
+        )
+        parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+        parser.add_argument('--dry-run', action='store_true', help='Report savings without writing files')
+        parser.add_argument('--force', action='store_true', help='Ignore the manifest and reprocess every file')
+
+    def handle(self, *args, **options):
+        root = Path(options['path'])
+        manifest_path = root / MANIFEST_NAME
+        manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+        # Skip files whose content still matches what the last run produced
+        candidates, hashes = [], {}
+        for path in sorted(root.rglob('*')):
+            if not path.is_file() or path.suffix.lower() not in STATIC_IMAGE_EXTENSIONS:
+                continue
+            relative = path.relative_to(root).as_posix()
+            hashes[relative] = file_hash(path)
+            if options['force'] or manifest.get(relative) != hashes[relative] or not sibling_path(path, '.webp').exists():
+                candidates.append(path)
+
+        self.report_duplicates(hashes)
+        self.stdout.write(
+            f'Optimizing {len(candidates)} of {len(hashes)} image(s)'
+            f'{" (AVIF enabled)" if avif_supported() else ""}...'
+        )
+
+        saved = defaultdict(lambda: [0, 0, 0])  # directory -> [before, after, siblings]
+        errors = 0
+        results = optimize_static_images(
+            candidates, options['workers'], jpeg_quality=options['quality'], dry_run=options['dry_run'],
+        )
+        for path, result, error in results:
+            relative = path.relative_to(root).as_posix()
+            if error is not None:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f'  [ERROR] {relative}: {error}'))
+                continue
+            totals = saved[path.parent.relative_to(root).as_posix()]
+            totals[0] += result['original_size']
+            totals[1] += result['optimized_size']
+            totals[2] += sum(result['sibling_sizes'].values())
+            manifest[relative] = result['hash']
+
+        for directory, (before, after, siblings) in sorted(saved.items()):
+            self.stdout.write(
+                f'  {directory or "."}: {before:,} -> {after:,} bytes '
+                f'({before - after:,} saved), modern-format siblings {siblings:,} bytes'
+            )
+
+        total_before = sum(totals[0] for totals in saved.values())
+        total_after = sum(totals[1] for totals in saved.values())
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: no files were written.'))
+        else:
+            manifest = {relative: digest for relative, digest in manifest.items() if (root / relative).exists()}
+            manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_before - total_after:,} bytes saved across {len(candidates)} image(s), {errors} error(s).'
+        ))
+
+    def report_duplicates(self, hashes):
+        by_hash = defaultdict(list)
+        for relative, digest in hashes.items():
+            by_hash[digest].append(relative)
+        duplicates = [paths for paths in by_hash.values() if len(paths) > 1]
+        if not duplicates:
+            return
+        self.stdout.write(self.style.WARNING(f'{len(duplicates)} set(s) of byte-identical images:'))
+        for paths in sorted(duplicates):
+            self.stdout.write(f'  {" = ".join(paths)}')
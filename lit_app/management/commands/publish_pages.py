@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lit_app.publishing import publish_pages
+
+
+class Command(BaseCommand):
+    help = 'Render the public pages to compressed static files for WhiteNoise or a proxy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--root',
+            help=f'Output directory (default: PUBLISH_ROOT, currently {settings.PUBLISH_ROOT})',
+        )
+
+    def handle(self, *args, **options):
+        for path in publish_pages(options['root']):
+            self.stdout.write(f'  [OK] {path}')
+        self.stdout.write(self.style.SUCCESS('Pages published successfully.'))
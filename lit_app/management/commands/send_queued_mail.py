@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from lit_app.mail import deliver_queued_mail
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued contact form emails (once, or continuously with --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue until interrupted')
+        parser.add_argument('--interval', type=float, default=10, help='Seconds between polls with --loop (default: 10)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages sent per SMTP connection (default: 50)')
+
+    def handle(self, *args, **options):
+        while True:
+            # Drain everything that is due before going back to sleep
+            while True:
+                sent, failed = deliver_queued_mail(options['batch_size'])
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent}, failed {failed}')
+                if sent + failed < options['batch_size']:
+                    break
+            if not options['loop']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
+        self.stdout.write(self.style.SUCCESS('Mail queue drained.'))
@@ -0,0 +1,73 @@
+import asyncio
+import random
+import time
+from email import message_from_bytes
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class SinkHandler:
+    """aiosmtpd handler that accepts (or deliberately defers) every message."""
+
+    def __init__(self, command, fail_rate=0.0, delay=0.0):
+        self.command = command
+        self.fail_rate = fail_rate
+        self.delay = delay
+        self.accepted = 0
+        self.deferred = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            self.deferred += 1
+            self.command.stdout.write(self.command.style.WARNING('  [451] simulated temporary failure'))
+            return '451 4.3.0 Simulated temporary failure'
+        self.accepted += 1
+        subject = message_from_bytes(envelope.content).get('Subject', '')
+        self.command.stdout.write(
+            f'  [250] {envelope.mail_from} -> {", ".join(envelope.rcpt_tos)}: '
+            f'{subject} ({len(envelope.content):,} bytes)'
+        )
+        return '250 Message accepted for delivery'
+
+
+class Command(BaseCommand):
+    help = 'Run a local SMTP server that accepts and discards mail, standing in for Gmail'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=1025, help='Port to listen on (default: 1025)')
+        parser.add_argument(
+            '--fail-rate', type=float, default=0.0,
+            help='Fraction of messages answered with a 451 so the outbox retries them (default: 0)',
+        )
+        parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before answering DATA')
+
+    def handle(self, *args, **options):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise CommandError('smtp_sink needs aiosmtpd: pip install aiosmtpd')
+
+        handler = SinkHandler(self, options['fail_rate'], options['delay'])
+        controller = Controller(handler, hostname=options['host'], port=options['port'])
+        controller.start()
+        self.stdout.write(self.style.SUCCESS(
+            f'SMTP sink listening on {options["host"]}:{options["port"]}. Point the outbox worker at it with\n'
+            f'  EMAIL_HOST={options["host"]} EMAIL_PORT={options["port"]} EMAIL_USE_TLS=False '
+            f'python manage.py send_queued_mail --loop\n'
+            f'Press Ctrl-C to stop.'
+        ))
+        started = time.monotonic()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            controller.stop()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{handler.accepted} message(s) accepted, {handler.deferred} deferred in {elapsed:.0f}s.'
+        ))
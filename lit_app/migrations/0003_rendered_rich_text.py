@@ -0,0 +1,92 @@
+# Generated by Django 4.2.26 on 2026-10-18 08:59
+
+from django.db import migrations
+import lit_app.rich_text
+
+RICH_TEXT_MODELS = (
+    'AboutSection', 'ServicesSection', 'PortfolioSection', 'PartnersSection', 'ExamplesSection',
+    'ContactSection', 'ServiceItem',
+)
+
+
+def render_existing(apps, schema_editor):
+    for model_name in RICH_TEXT_MODELS:
+        model = apps.get_model('lit_app', model_name)
+        fields = [
+            field.name for field in model._meta.fields
+            if isinstance(field, lit_app.rich_text.RenderedRichTextField)
+        ]
+        # RenderedRichTextField.pre_save renders each companion from its source
+        for obj in model.objects.all():
+            obj.save(update_fields=fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lit_app', '0002_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aboutsection',
+            name='description_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='description'),
+        ),
+        migrations.AddField(
+            model_name='aboutsection',
+            name='subtitle_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='subtitle', strip_wrapper=True),
+        ),
+        migrations.AddField(
+            model_name='contactsection',
+            name='subtitle_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='subtitle'),
+        ),
+        migrations.AddField(
+            model_name='examplessection',
+            name='description_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='description'),
+        ),
+        migrations.AddField(
+            model_name='examplessection',
+            name='subtitle_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='subtitle', strip_wrapper=True),
+        ),
+        migrations.AddField(
+            model_name='partnerssection',
+            name='description_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='description'),
+        ),
+        migrations.AddField(
+            model_name='partnerssection',
+            name='subtitle_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='subtitle', strip_wrapper=True),
+        ),
+        migrations.AddField(
+            model_name='portfoliosection',
+            name='description_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='description'),
+        ),
+        migrations.AddField(
+            model_name='portfoliosection',
+            name='subtitle_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='subtitle', strip_wrapper=True),
+        ),
+        migrations.AddField(
+            model_name='serviceitem',
+            name='description_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='description'),
+        ),
+        migrations.AddField(
+            model_name='servicessection',
+            name='description_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='description'),
+        ),
+        migrations.AddField(
+            model_name='servicessection',
+            name='subtitle_html',
+            field=lit_app.rich_text.RenderedRichTextField(source='subtitle', strip_wrapper=True),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:27
+
+from django.db import migrations, models
+import lit_app.youtube
+
+
+def parse_existing(apps, schema_editor):
+    # YouTubeVideoIdField.pre_save parses each ID from youtube_url
+    for video in apps.get_model('lit_app', 'ExampleVideo').objects.all():
+        video.save(update_fields=['video_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lit_app', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examplevideo',
+            name='poster',
+            field=models.ImageField(blank=True, help_text='Shown until the video is played; fetched from YouTube when left empty', upload_to='examples/'),
+        ),
+        migrations.AddField(
+            model_name='examplevideo',
+            name='video_id',
+            field=lit_app.youtube.YouTubeVideoIdField(source='youtube_url'),
+        ),
+        migrations.AlterField(
+            model_name='examplevideo',
+            name='youtube_url',
+            field=models.URLField(help_text='Any YouTube link to the video: watch, youtu.be, embed or Shorts', validators=[lit_app.youtube.validate_youtube_url]),
+        ),
+        migrations.RunPython(parse_existing, migrations.RunPython.noop),
+    ]
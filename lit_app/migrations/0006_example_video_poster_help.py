@@ -0,0 +1,18 @@
+# Generated by Django 4.2.26 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lit_app', '0005_example_video_facade'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='examplevideo',
+            name='poster',
+            field=models.ImageField(blank=True, help_text='Shown until the video is played; left empty, manage.py fetch_video_posters fetches it from YouTube', upload_to='examples/'),
+        ),
+    ]
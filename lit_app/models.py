@@ -1,12 +1,17 @@
 from django.db import models
+from django.utils import timezone
 from django_ckeditor_5.fields import CKEditor5Field
 
+from .rich_text import RenderedRichTextField
+from .youtube import EMBED_URL, WATCH_URL, YouTubeVideoIdField, validate_youtube_url
+
 
 class HeroSection(models.Model):
     """Hero section with logo and background image"""
     logo_image = models.ImageField(upload_to='hero/', help_text='Logo image (280x auto)')
     background_image = models.ImageField(upload_to='hero/', help_text='Hero background image')
     is_active = models.BooleanField(default=True, help_text='Display this hero section')
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Hero Section'
@@ -21,6 +26,8 @@ class AboutSection(models.Model):
     title = models.CharField(max_length=200, default='About Us')
     subtitle = CKEditor5Field('Subtitle', config_name='extends')
     description = CKEditor5Field('Description', config_name='extends')
+    subtitle_html = RenderedRichTextField(source='subtitle', strip_wrapper=True)
+    description_html = RenderedRichTextField(source='description')
 
     # Service icons (displayed as grid)
     service_1_icon = models.CharField(max_length=50, default='fa fa-comments', help_text='FontAwesome class (e.g., fa fa-comments)')
@@ -48,6 +55,7 @@ class AboutSection(models.Model):
     service_8_text = models.CharField(max_length=100, default='Custom Software')
 
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'About Section'
@@ -61,10 +69,12 @@ class ServiceItem(models.Model):
     """Individual service item in Services section"""
     title = models.CharField(max_length=200)
     description = CKEditor5Field('Description', config_name='extends')
+    description_html = RenderedRichTextField(source='description')
     image = models.ImageField(upload_to='services/')
     order = models.IntegerField(default=0, help_text='Display order (lower numbers first)')
     anchor_id = models.CharField(max_length=50, blank=True, help_text='HTML anchor ID (e.g., cctv, card)')
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Service Item'
@@ -80,7 +90,10 @@ class ServicesSection(models.Model):
     title = models.CharField(max_length=200, default='Our Services')
     subtitle = CKEditor5Field('Subtitle', config_name='extends')
     description = CKEditor5Field('Description', config_name='extends')
+    subtitle_html = RenderedRichTextField(source='subtitle', strip_wrapper=True)
+    description_html = RenderedRichTextField(source='description')
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Services Section Header'
@@ -95,6 +108,8 @@ class PortfolioSection(models.Model):
     title = models.CharField(max_length=200, default='Portfolio')
     subtitle = CKEditor5Field('Subtitle', config_name='extends')
     description = CKEditor5Field('Description', config_name='extends')
+    subtitle_html = RenderedRichTextField(source='subtitle', strip_wrapper=True)
+    description_html = RenderedRichTextField(source='description')
 
     # Portfolio images
     image_1 = models.ImageField(upload_to='portfolio/', blank=True)
@@ -110,6 +125,7 @@ class PortfolioSection(models.Model):
     image_4_alt = models.CharField(max_length=200, default='Portfolio Project 4')
 
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Portfolio Section'
@@ -125,6 +141,7 @@ class PartnerItem(models.Model):
     logo = models.ImageField(upload_to='partners/')
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Partner'
@@ -140,7 +157,10 @@ class PartnersSection(models.Model):
     title = models.CharField(max_length=200, default='Our Partners')
     subtitle = CKEditor5Field('Subtitle', config_name='extends')
     description = CKEditor5Field('Description', config_name='extends')
+    subtitle_html = RenderedRichTextField(source='subtitle', strip_wrapper=True)
+    description_html = RenderedRichTextField(source='description')
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Partners Section Header'
@@ -152,9 +172,18 @@ class PartnersSection(models.Model):
 
 class ExampleVideo(models.Model):
     """Individual example video"""
-    youtube_url = models.URLField(help_text='Full YouTube URL (will be converted to embed)')
+    youtube_url = models.URLField(
+        validators=[validate_youtube_url],
+        help_text='Any YouTube link to the video: watch, youtu.be, embed or Shorts',
+    )
+    video_id = YouTubeVideoIdField(source='youtube_url')
+    poster = models.ImageField(
+        upload_to='examples/', blank=True,
+        help_text='Shown until the video is played; left empty, manage.py fetch_video_posters fetches it from YouTube',
+    )
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Example Video'
@@ -164,13 +193,24 @@ class ExampleVideo(models.Model):
     def __str__(self):
         return f"Video {self.order}: {self.youtube_url[:50]}"
 
+    @property
+    def embed_url(self):
+        return EMBED_URL.format(video_id=self.video_id)
+
+    @property
+    def watch_url(self):
+        return WATCH_URL.format(video_id=self.video_id)
+
 
 class ExamplesSection(models.Model):
     """Examples section header"""
     title = models.CharField(max_length=200, default='Examples')
     subtitle = CKEditor5Field('Subtitle', config_name='extends')
     description = CKEditor5Field('Description', config_name='extends')
+    subtitle_html = RenderedRichTextField(source='subtitle', strip_wrapper=True)
+    description_html = RenderedRichTextField(source='description')
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Examples Section Header'
@@ -184,9 +224,11 @@ class ContactSection(models.Model):
     """Contact section"""
     title = models.CharField(max_length=200, default='Get LiT Now!')
     subtitle = CKEditor5Field('Subtitle', config_name='extends')
+    subtitle_html = RenderedRichTextField(source='subtitle')
     phone = models.CharField(max_length=50, default='(954) 445-0712')
     google_maps_embed_url = models.URLField(help_text='Google Maps embed iframe src URL')
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Contact Section'
@@ -213,6 +255,7 @@ class FooterSection(models.Model):
     developer_url = models.URLField(blank=True)
 
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Footer Section'
@@ -220,3 +263,35 @@ class FooterSection(models.Model):
 
     def __str__(self):
         return 'Footer Section'
+
+
+class OutboundEmail(models.Model):
+    """Contact form email waiting to be delivered by the send_queued_mail worker"""
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead letter'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.CharField(max_length=254, help_text='Recipient address')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text='Not retried before this time')
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
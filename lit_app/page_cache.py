@@ -0,0 +1,300 @@
+"""Rendered-page cache for anonymous homepage traffic.
+
+Rendering ``pages/index.html`` walks a dozen includes and filters even when
+the content snapshot is warm, so the finished bytes are cached as well, keyed
+on the content version (see ``lit_app.content``). The most recent page is
+also held in process memory so a hit does not even need a cache round trip.
+
+A cold page is rendered by one worker at a time; the rest keep serving the
+previous version meanwhile (see ``get_rendered_page``), so an edit or a
+cache flush does not send every worker to the database at once.
+
+Pages are rendered without a request, so every anonymous visitor gets the
+same bytes: the contact form fetches its CSRF token from ``/csrf-token/``
+only once someone starts filling it in. That also lets a shared cache in
+front of Django keep the page (see ``set_page_validators``).
+
+With ``stream`` a page this worker has to render is handed back as chunks
+(see ``lit_app.streaming``), so the ``<head>`` reaches the browser before the
+sections are rendered; the page is cached once the last chunk is out.
+
+The same content renders differently after a deploy (new templates, new
+hashed asset URLs), so page keys and validators also carry the build version
+(see ``build_version``): a new build neither serves nor 304s the previous
+build's pages.
+"""
+import asyncio
+import functools
+import hashlib
+import time
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .content import aget_snapshot, get_snapshot
+from .profiling import record_cache
+from .streaming import aiterate, stream_template
+
+PAGE_CACHE_KEY = 'lit_app:page:{build}:{template_name}:{version}'
+PAGE_LOCK_KEY = 'lit_app:page_lock:{build}:{template_name}:{version}'
+LATEST_PAGE_KEY = 'lit_app:page_latest:{build}:{template_name}'
+
+# Seconds a render lock outlives a worker that died while holding it
+PAGE_LOCK_TIMEOUT = 30
+# Seconds a request with no stale page to serve waits for another worker's
+# render before giving up and rendering itself
+PAGE_LOCK_WAIT = 2.0
+PAGE_LOCK_POLL = 0.05
+
+# template name -> (content version, rendered bytes) for this process
+_rendered_pages = {}
+
+
+@functools.cache
+def build_version():
+    """``(version, mtime)`` of the code and assets pages are rendered with.
+
+    ``settings.BUILD_VERSION`` (say, the deployed commit) if set, otherwise a
+    digest of the project templates, ``lit_app``'s Python sources and the
+    static files manifest. ``mtime`` is the newest of those files, so
+    ``Last-Modified`` moves forward with a deploy too.
+    """
+    paths = sorted(
+        path for root in (settings.BASE_DIR / 'templates', Path(__file__).parent)
+        for path in root.rglob('*') if path.suffix in ('.html', '.py')
+    )
+    manifest = Path(settings.STATIC_ROOT) / getattr(staticfiles_storage, 'manifest_name', '')
+    if manifest.is_file():
+        paths.append(manifest)
+    digest = hashlib.md5(usedforsecurity=False)
+    for path in paths:
+        digest.update(path.read_bytes())
+    mtime = max((int(path.stat().st_mtime) for path in paths), default=0)
+    return settings.BUILD_VERSION or digest.hexdigest()[:12], mtime
+
+
+def page_key(key, template_name, **kwargs):
+    """``key`` formatted for ``template_name`` as rendered by this build."""
+    return key.format(build=build_version()[0], template_name=template_name, **kwargs)
+
+
+def get_rendered_page(template_name, version, stream=False):
+    """Return ``(version, bytes)`` of ``template_name``, rendered for ``version``.
+
+    After a content change (or a cache flush) only one worker renders the new
+    page: whoever adds the lock key. The others serve the newest page they
+    can find, which comes back with its own, older version so the caller's
+    validators never label old bytes as current. Only a request with no
+    page at all waits for the render; right after a deploy that is every
+    request, since pages of the previous build are never served.
+
+    With ``stream``, a page rendered by this call comes back as an iterator
+    of byte chunks instead; it holds the lock until it is exhausted or closed.
+    """
+    local = _rendered_pages.get(template_name)
+    if local is not None and local[0] == version:
+        record_cache('page', True)
+        return local
+
+    key = page_key(PAGE_CACHE_KEY, template_name, version=version)
+    content = cache.get(key)
+    record_cache('page', content is not None)
+    if content is None:
+        lock_key = page_key(PAGE_LOCK_KEY, template_name, version=version)
+        if cache.add(lock_key, True, PAGE_LOCK_TIMEOUT):
+            if stream:
+                return version, stream_page(template_name, version, lock_key)
+            try:
+                content = render_page(template_name, version)
+            finally:
+                cache.delete(lock_key)
+        else:
+            stale = local or cache.get(page_key(LATEST_PAGE_KEY, template_name))
+            if stale is not None:
+                record_cache('stale_page', True)
+                return stale
+            content = wait_for_page(key) or render_page(template_name, version)
+    _rendered_pages[template_name] = (version, content)
+    return version, content
+
+
+def render_page(template_name, version):
+    content = render_to_string(template_name, get_snapshot(version)).encode()
+    store_page(template_name, version, content)
+    return content
+
+
+def stream_page(template_name, version, lock_key):
+    # The snapshot is loaded before the first chunk, so a database error is
+    # still a plain 500 rather than a truncated page
+    return StreamedPage(stream_template(template_name, get_snapshot(version)), template_name, version, lock_key)
+
+
+class StreamedPage:
+    """The chunks of a page being rendered, cached once the last one is out.
+
+    The render lock is released when the chunks run out or when the response
+    is closed, whichever comes first: ``StreamingHttpResponse.close()`` calls
+    ``close()`` here even if the response was never iterated (a client that
+    went away, a middleware that replaced the response).
+    """
+
+    def __init__(self, chunks, template_name, version, lock_key):
+        self.chunks = chunks
+        self.template_name = template_name
+        self.version = version
+        self.lock_key = lock_key
+        self.locked = True
+
+    def __iter__(self):
+        rendered = []
+        try:
+            for chunk in self.chunks:
+                rendered.append(chunk.encode())
+                yield rendered[-1]
+            content = b''.join(rendered)
+            store_page(self.template_name, self.version, content)
+            _rendered_pages[self.template_name] = (self.version, content)
+        finally:
+            self.close()
+
+    def close(self):
+        if self.locked:
+            self.locked = False
+            cache.delete(self.lock_key)
+
+
+def store_page(template_name, version, content):
+    cache.set(page_key(PAGE_CACHE_KEY, template_name, version=version), content,
+              settings.CONTENT_CACHE_TIMEOUT)
+    cache.set(page_key(LATEST_PAGE_KEY, template_name), (version, content), None)
+
+
+def wait_for_page(key):
+    deadline = time.monotonic() + PAGE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(PAGE_LOCK_POLL)
+        content = cache.get(key)
+        if content is not None:
+            return content
+    return None
+
+
+async def aget_rendered_page(template_name, version, stream=False):
+    """Async counterpart of ``get_rendered_page``; ``stream`` gives an async iterator.
+
+    Cache and database lookups are awaited. Rendering runs in a thread, as
+    it is synchronous code that still reads the cache (the template loader's
+    version check, ``cached_fragment`` and ``{% picture %}``).
+    """
+    local = _rendered_pages.get(template_name)
+    if local is not None and local[0] == version:
+        record_cache('page', True)
+        return local
+
+    key = page_key(PAGE_CACHE_KEY, template_name, version=version)
+    content = await cache.aget(key)
+    record_cache('page', content is not None)
+    if content is None:
+        lock_key = page_key(PAGE_LOCK_KEY, template_name, version=version)
+        if await cache.aadd(lock_key, True, PAGE_LOCK_TIMEOUT):
+            if stream:
+                return version, await astream_page(template_name, version, lock_key)
+            try:
+                content = await arender_page(template_name, version)
+            finally:
+                await cache.adelete(lock_key)
+        else:
+            stale = local or await cache.aget(page_key(LATEST_PAGE_KEY, template_name))
+            if stale is not None:
+                record_cache('stale_page', True)
+                return stale
+            content = await await_page(key) or await arender_page(template_name, version)
+    _rendered_pages[template_name] = (version, content)
+    return version, content
+
+
+async def arender_page(template_name, version):
+    content = (await sync_to_async(render_to_string)(template_name, await aget_snapshot(version))).encode()
+    await astore_page(template_name, version, content)
+    return content
+
+
+async def astream_page(template_name, version, lock_key):
+    chunks = stream_template(template_name, await aget_snapshot(version))
+    return AsyncStreamedPage(chunks, template_name, version, lock_key)
+
+
+class AsyncStreamedPage(StreamedPage):
+    """``StreamedPage`` as an async iterator; Django's ASGI handler closes it in a thread."""
+
+    def __iter__(self):
+        raise TypeError(f'{type(self).__name__} is an async iterator')
+
+    async def __aiter__(self):
+        rendered = []
+        try:
+            async for chunk in aiterate(self.chunks):
+                rendered.append(chunk.encode())
+                yield rendered[-1]
+            content = b''.join(rendered)
+            await astore_page(self.template_name, self.version, content)
+            _rendered_pages[self.template_name] = (self.version, content)
+        finally:
+            if self.locked:
+                self.locked = False
+                await cache.adelete(self.lock_key)
+
+
+async def astore_page(template_name, version, content):
+    await cache.aset(page_key(PAGE_CACHE_KEY, template_name, version=version), content,
+                     settings.CONTENT_CACHE_TIMEOUT)
+    await cache.aset(page_key(LATEST_PAGE_KEY, template_name), (version, content), None)
+
+
+async def await_page(key):
+    deadline = time.monotonic() + PAGE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(PAGE_LOCK_POLL)
+        content = await cache.aget(key)
+        if content is not None:
+            return content
+    return None
+
+
+def not_modified_response(request, version):
+    """Return a 304 response if the client already has ``version``, else None."""
+    return get_conditional_response(
+        request, etag=page_etag(version), last_modified=page_last_modified(version),
+    )
+
+
+def page_etag(version):
+    return quote_etag(f'v{version}-{build_version()[0]}')
+
+
+def page_last_modified(version):
+    return max(version, build_version()[1])
+
+
+def set_page_validators(response, version, shared=True):
+    """Attach ETag/Last-Modified for ``version`` and this build; require revalidation.
+
+    The anonymous page is the same for everyone, so any cache may keep it
+    (``shared``); pages rendered for a signed-in editor stay ``private``.
+    ``max-age=0`` makes every reuse revalidate and receive a 304.
+    """
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', page_etag(version))
+        response.headers.setdefault('Last-Modified', http_date(page_last_modified(version)))
+    if shared:
+        patch_cache_control(response, public=True, max_age=0)
+    else:
+        patch_cache_control(response, private=True, max_age=0)
+    return response
@@ -0,0 +1,156 @@
+"""Sampled per-request profiling, reported as ``Server-Timing`` and log lines.
+
+Add ``ServerTimingMiddleware`` by setting ``PROFILING_SAMPLE_RATE`` (a
+fraction of requests, e.g. ``0.01``). For a sampled request it records:
+
+* database queries: count and total time, through an execute wrapper that
+  every connection gets when it is opened (so queries run in
+  ``sync_to_async`` threads are counted too)
+* render time of each section template, via the ``timed_section`` blocks
+  ``InliningCachedLoader`` puts around inlined ``{% include %}``s
+* hits and misses of the content-layer caches (version, snapshot, page)
+* total time spent below the middleware
+
+Unsampled requests pay for one ``random()`` call and a context-variable
+lookup per query or cache access.
+"""
+import json
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('lit_app_request_profile', default=None)
+
+METRIC_NAME_RE = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+class RequestProfile:
+    def __init__(self, path):
+        self.path = path
+        self.queries = 0
+        self.query_time = 0.0
+        self.sections = {}
+        self.cache = {}
+        self.total = 0.0
+
+    def server_timing(self):
+        """``Server-Timing`` header value; durations are in milliseconds."""
+        metrics = [
+            f'total;dur={self.total * 1000:.2f}',
+            f'db;dur={self.query_time * 1000:.2f};desc="{self.queries} queries"',
+        ]
+        for name, seconds in self.sections.items():
+            metric = METRIC_NAME_RE.sub('-', name.removesuffix('.html'))
+            metrics.append(f'tpl-{metric};dur={seconds * 1000:.2f}')
+        for name, hit in self.cache.items():
+            metrics.append(f'cache-{name};desc="{"hit" if hit else "miss"}"')
+        return ', '.join(metrics)
+
+    def as_dict(self):
+        return {
+            'path': self.path,
+            'total_ms': round(self.total * 1000, 2),
+            'queries': self.queries,
+            'db_ms': round(self.query_time * 1000, 2),
+            'sections_ms': {name: round(seconds * 1000, 2) for name, seconds in self.sections.items()},
+            'cache': {name: 'hit' if hit else 'miss' for name, hit in self.cache.items()},
+        }
+
+
+def record_cache(name, hit):
+    """Note a hit or miss of content-layer cache ``name`` for a sampled request."""
+    profile = _current.get()
+    if profile is not None:
+        profile.cache[name] = hit
+
+
+@contextmanager
+def section_timer(name):
+    """Add the time spent inside the block to section ``name``."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.sections[name] = profile.sections.get(name, 0.0) + time.perf_counter() - start
+
+
+def record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.query_time += time.perf_counter() - start
+
+
+@receiver(connection_created, dispatch_uid='lit_app_profile_queries')
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class ServerTimingMiddleware:
+    """Profile a ``PROFILING_SAMPLE_RATE`` fraction of requests."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened before the middleware loaded missed the signal
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(sender=None, connection=connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        profile = RequestProfile(request.path)
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(profile, response, start)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        profile = RequestProfile(request.path)
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(profile, response, start)
+
+    def sampled(self):
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def report(self, profile, response, start):
+        profile.total = time.perf_counter() - start
+        response['Server-Timing'] = profile.server_timing()
+        logger.info(json.dumps(dict(profile.as_dict(), status=response.status_code), sort_keys=True))
+        return response
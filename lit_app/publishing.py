@@ -0,0 +1,76 @@
+"""Render-to-disk publishing of the public pages.
+
+The public site only changes when an editor saves in the admin, so its pages
+can be rendered ahead of time and served as plain files by WhiteNoise or a
+front proxy. Each page is written as ``.html`` plus ``.html.gz`` (and
+``.html.br`` when the optional ``brotli`` package is installed) under
+``settings.PUBLISH_ROOT``, laid out so the directory mirrors the URL space:
+
+    PUBLISH_ROOT/index.html               ->  /
+    PUBLISH_ROOT/email-sent/index.html    ->  /email-sent/
+
+Every file is written to a temporary sibling and moved into place with
+``os.replace``, so a reader sees either the old page or the new one, never a
+partial write.
+"""
+import gzip
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from .content import get_snapshot
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# template -> path relative to PUBLISH_ROOT
+PUBLISHED_PAGES = (
+    ('pages/index.html', 'index.html'),
+    ('pages/emailsent.html', 'email-sent/index.html'),
+)
+
+
+def publish_pages(root=None):
+    """Render every published page to disk and return the paths written."""
+    root = Path(root or settings.PUBLISH_ROOT)
+    context = get_snapshot()
+    written = []
+    for template_name, relative_path in PUBLISHED_PAGES:
+        content = render_to_string(template_name, context).encode()
+        written.extend(write_page(root / relative_path, content))
+    return written
+
+
+def write_page(path, content):
+    """Atomically write ``content`` and its compressed variants to ``path``.
+
+    Compressed variants go first so the plain file, which is what a proxy
+    checks for, never advertises a page whose variants are still missing.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    variants = [(path.with_name(path.name + '.gz'), gzip.compress(content, 9, mtime=0))]
+    if brotli is not None:
+        variants.append((path.with_name(path.name + '.br'), brotli.compress(content)))
+    variants.append((path, content))
+    for target, data in variants:
+        atomic_write(target, data)
+    return [target for target, _ in variants]
+
+
+def atomic_write(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
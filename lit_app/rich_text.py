@@ -0,0 +1,115 @@
+"""Render-once HTML for the CKEditor5 rich-text fields.
+
+Each rich-text field has a ``<name>_html`` companion column
+(``RenderedRichTextField``) that is recomputed from it on every save: the
+editor HTML is sanitized, whitespace runs collapse to one space (except
+inside ``<pre>``), and for subtitles shown inside ``<h6>`` the single outer
+``<p>``/``<div>`` wrapper is removed. Templates output the companion as is,
+so no HTML processing happens per request.
+"""
+import re
+
+import nh3
+from django.db import models
+
+# Attributes produced by the editor toolbar ("extends" config): font colour,
+# size and family and alignment end up in style/class attributes.
+ALLOWED_ATTRIBUTES = {
+    '*': {'class', 'style', 'title'},
+    'a': {'href', 'target'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+ALLOWED_STYLE_PROPERTIES = {
+    'background-color', 'border', 'border-color', 'border-style', 'border-width', 'color',
+    'font-family', 'font-size', 'font-style', 'font-weight', 'height', 'margin-left', 'padding',
+    'padding-left', 'text-align', 'text-decoration', 'vertical-align', 'width',
+}
+
+# `\s[^>]*` rather than `\s+[^>]*`: the overlapping quantifiers backtrack
+# quadratically on an unterminated tag full of whitespace.
+OPEN_WRAPPER_RE = re.compile(r'<(p|div)(?:\s[^>]*)?>', re.IGNORECASE)
+WRAPPER_TAG_RES = {
+    tag: re.compile(rf'<(/?){tag}\b', re.IGNORECASE) for tag in ('p', 'div')
+}
+PRE_BLOCK_RE = re.compile(r'(<pre\b.*?</pre>)', re.IGNORECASE | re.S)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def sanitize_html(value):
+    return nh3.clean(
+        value,
+        attributes=ALLOWED_ATTRIBUTES,
+        filter_style_properties=ALLOWED_STYLE_PROPERTIES,
+    )
+
+
+def collapse_whitespace(value):
+    parts = PRE_BLOCK_RE.split(value)
+    # split() puts the captured <pre> blocks at the odd indexes
+    return ''.join(part if i % 2 else WHITESPACE_RE.sub(' ', part) for i, part in enumerate(parts)).strip()
+
+
+def strip_outer_wrapper(value):
+    """Remove one ``<p>``/``<div>`` element that wraps the whole of ``value``.
+
+    Runs in linear time: the opening tag is matched at the start, the closing
+    tag checked at the end, and one pass over the inside confirms the opening
+    tag is not closed earlier (``<p>a</p><p>b</p>`` is left alone). Anything
+    else is returned unchanged.
+    """
+    text = value.strip()
+    if not (text.startswith('<') and text.endswith('>')):
+        return value
+    match = OPEN_WRAPPER_RE.match(text)
+    if match is None:
+        return value
+    tag = match.group(1).lower()
+    closing = f'</{tag}>'
+    if len(text) - len(closing) < match.end() or text[-len(closing):].lower() != closing:
+        return value
+    inner = text[match.end():-len(closing)]
+    depth = 0
+    for nested in WRAPPER_TAG_RES[tag].finditer(inner):
+        depth += -1 if nested.group(1) else 1
+        if depth < 0:
+            return value
+    return inner
+
+
+def render_rich_text(value, strip_wrapper=False):
+    """Final HTML for a rich-text value, ready to output without escaping."""
+    if not value:
+        return ''
+    html = collapse_whitespace(sanitize_html(str(value)))
+    if strip_wrapper:
+        html = strip_outer_wrapper(html).strip()
+    return html
+
+
+class RenderedRichTextField(models.TextField):
+    """Read-only companion column holding ``render_rich_text(<source field>)``."""
+
+    def __init__(self, source=None, strip_wrapper=False, **kwargs):
+        self.source = source
+        self.strip_wrapper = strip_wrapper
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        super().__init__(**kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        if self.strip_wrapper:
+            kwargs['strip_wrapper'] = True
+        for key, default in (('editable', False), ('blank', True), ('default', '')):
+            if kwargs.get(key, not default) == default:
+                kwargs.pop(key, None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = render_rich_text(getattr(model_instance, self.source), self.strip_wrapper)
+        setattr(model_instance, self.attname, value)
+        return value
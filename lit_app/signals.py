@@ -0,0 +1,82 @@
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .content import (
+    CONTENT_MODELS, SECTION_NAMES, bump_content_version, bump_scope_version, section_scope
+)
+from .images import delete_derivatives, generate_instance_derivatives, image_field_names
+from .publishing import publish_pages
+
+logger = logging.getLogger(__name__)
+
+
+def content_changed(sender, **kwargs):
+    """Bump the content version once the change is committed.
+
+    Waiting for the commit keeps a concurrent request from caching a page
+    built from rows the admin transaction has not written yet.
+    """
+    transaction.on_commit(partial(bump_scope_version, section_scope(SECTION_NAMES[sender])))
+    transaction.on_commit(bump_content_version)
+    if settings.PUBLISH_ON_SAVE:
+        transaction.on_commit(republish_pages)
+
+
+def image_saving(sender, instance, raw=False, **kwargs):
+    """Note the stored images this save replaces, for ``image_saved``."""
+    instance._replaced_images = []
+    if raw or instance.pk is None:
+        return
+    fields = image_field_names(sender)
+    stored = sender._default_manager.filter(pk=instance.pk).values(*fields).first()
+    if stored is not None:
+        instance._replaced_images = [
+            (field, stored[field]) for field in fields if stored[field] and stored[field] != getattr(instance, field).name
+        ]
+
+
+def image_saved(sender, instance, raw=False, **kwargs):
+    """Generate responsive derivatives for the saved instance's images.
+
+    Derivatives of images the save replaced are deleted. Registered ahead
+    of ``content_changed`` so the derivatives exist by the time the version
+    bump lets the homepage be re-rendered with them.
+    """
+    if not raw:
+        replaced = getattr(instance, '_replaced_images', [])
+        transaction.on_commit(lambda: generate_derivatives(instance, replaced))
+
+
+def generate_derivatives(instance, replaced=()):
+    try:
+        deleted = []
+        for field, name in replaced:
+            # Another row may still show the old upload
+            if not type(instance)._default_manager.filter(**{field: name}).exists():
+                deleted.extend(delete_derivatives(name, getattr(instance, field).storage))
+        if generate_instance_derivatives(instance) or deleted:
+            # Listings cached before the files changed would be wrong
+            bump_scope_version('images')
+    except Exception:
+        logger.exception('Generating image derivatives for %r failed', instance)
+
+
+def republish_pages():
+    # The edit is already committed, so a failed publish must not turn the
+    # editor's save into an error page; the previous files keep being served.
+    try:
+        publish_pages()
+    except Exception:
+        logger.exception('Publishing pages after a content change failed')
+
+
+for model in CONTENT_MODELS:
+    if image_field_names(model):
+        pre_save.connect(image_saving, sender=model, dispatch_uid=f'{model.__name__}_images_saving')
+        post_save.connect(image_saved, sender=model, dispatch_uid=f'{model.__name__}_images_saved')
+    post_save.connect(content_changed, sender=model, dispatch_uid=f'{model.__name__}_saved')
+    post_delete.connect(content_changed, sender=model, dispatch_uid=f'{model.__name__}_deleted')
@@ -0,0 +1,19 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class LenientManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Hashed, pre-compressed static files that tolerate dangling references.
+
+    Some vendored stylesheets point at files that were never shipped (the
+    glyphicons fonts in bootstrap.min.css, owl.video.play.png in plugins.css).
+    Rather than failing collectstatic, such references are left unhashed, as
+    are ``{% static %}`` lookups for files missing from the manifest, so the
+    site still renders before collectstatic has run (e.g. in tests).
+    """
+    manifest_strict = False
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            return name
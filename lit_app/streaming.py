@@ -0,0 +1,113 @@
+"""Render a template as a sequence of chunks instead of one string.
+
+``stream_template`` walks the compiled template the way Django's own
+``ExtendsNode``/``BlockNode`` render it, but yields what it has so far
+before each homepage section: the ``timed_section`` blocks that
+``InliningCachedLoader`` wraps inlined includes in, or plain ``{% include %}``
+nodes where nothing is inlined. The ``<head>`` and its asset links go out
+before the first section is rendered, so the browser can fetch stylesheets
+while the rest of the page is still being built.
+
+Everything else renders exactly as ``Template.render`` would; only the
+moments at which the output is handed over change.
+"""
+from asgiref.sync import sync_to_async
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.loader import get_template
+from django.template.loader_tags import BLOCK_CONTEXT_KEY, BlockContext, BlockNode, ExtendsNode, IncludeNode
+
+from .templatetags.profiling import TimedSectionNode
+
+# Output is flushed right before each of these nodes renders
+SECTION_NODES = (TimedSectionNode, IncludeNode)
+
+# Marks a flush point among the rendered pieces
+FLUSH = object()
+
+
+def stream_template(template_name, context=None, request=None):
+    """Yield ``template_name`` rendered with ``context``, a section at a time."""
+    template = get_template(template_name)
+    context = make_context(context, request, autoescape=template.backend.engine.autoescape)
+    template = template.template
+    with context.render_context.push_state(template), context.bind_template(template):
+        context.template_name = template.name
+        pending = []
+        for piece in iter_nodelist(template.nodelist, context):
+            if piece is not FLUSH:
+                pending.append(piece)
+            elif pending:
+                yield ''.join(pending)
+                pending = []
+        if pending:
+            yield ''.join(pending)
+
+
+def iter_nodelist(nodelist, context):
+    for node in nodelist:
+        if isinstance(node, ExtendsNode):
+            yield from iter_extends(node, context)
+        elif isinstance(node, BlockNode):
+            yield from iter_block(node, context)
+        else:
+            if isinstance(node, SECTION_NODES):
+                yield FLUSH
+            yield node.render_annotated(context)
+
+
+def iter_extends(node, context):
+    """``ExtendsNode.render``, yielding the parent's chunks."""
+    compiled_parent = node.get_parent(context)
+    block_context = context.render_context.setdefault(BLOCK_CONTEXT_KEY, BlockContext())
+    block_context.add_blocks(node.blocks)
+    for parent_node in compiled_parent.nodelist:
+        if not isinstance(parent_node, TextNode):
+            if not isinstance(parent_node, ExtendsNode):
+                block_context.add_blocks({
+                    block.name: block for block in compiled_parent.nodelist.get_nodes_by_type(BlockNode)
+                })
+            break
+    with context.render_context.push_state(compiled_parent, isolated_context=False):
+        yield from iter_nodelist(compiled_parent.nodelist, context)
+
+
+def iter_block(node, context):
+    """``BlockNode.render``, yielding the chunks of the overriding block."""
+    block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+    with context.push():
+        if block_context is None:
+            context['block'] = node
+            yield from iter_nodelist(node.nodelist, context)
+            return
+        push = block = block_context.pop(node.name)
+        if block is None:
+            block = node
+        block = type(node)(block.name, block.nodelist)
+        block.context = context
+        context['block'] = block
+        try:
+            yield from iter_nodelist(block.nodelist, context)
+        finally:
+            if push is not None:
+                block_context.push(node.name, push)
+
+
+async def astream_template(template_name, context=None, request=None):
+    """``stream_template`` as an async iterator, for ``StreamingHttpResponse`` under ASGI.
+
+    A synchronous iterator would be buffered in full by Django's ASGI handler.
+    """
+    async for chunk in aiterate(stream_template(template_name, context, request)):
+        yield chunk
+
+
+async def aiterate(chunks):
+    """Yield from the synchronous iterator ``chunks``, advancing it in a thread.
+
+    Rendering is synchronous code that may query the cache or the database
+    (fragments, image derivatives, the template loader's version check).
+    """
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, FLUSH)) is not FLUSH:
+        yield chunk
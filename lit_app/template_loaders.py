@@ -0,0 +1,121 @@
+"""Production template loading.
+
+``InliningCachedLoader`` is Django's cached loader plus one compile-time
+step: a literal ``{% include 'name.html' %}`` (no ``with``/``only``) of a
+project template is replaced by that template's source, recursively, before
+compiling. ``pages/index.html`` then compiles to a single template with no
+per-request include lookups or context pushes.
+
+Included templates that use ``{% extends %}`` or ``{% block %}`` are left as
+includes, since inlining would make their blocks part of the including
+template's inheritance. Includes inside template comments are left alone.
+Each inlined source is wrapped in a ``timed_section`` block so sampled
+requests still get per-section render times (see ``lit_app.profiling``),
+and each of the homepage's ``HOMEPAGE_FRAGMENTS`` in a ``cached_fragment``
+block keyed on the rows it displays and a digest of its inlined source.
+
+Compiled templates are kept until the ``templates`` cache scope version
+changes (``python manage.py clearcache --templates``), which each process
+checks at most once every ``TEMPLATES_VERSION_CHECK_INTERVAL`` seconds.
+
+``warm_template_cache()`` compiles the public pages up front; ``wsgi.py`` and
+``asgi.py`` call it so the first request does not pay for compilation. It
+only logs a failure (say, an unreachable cache tier), so the app still starts
+and the first request compiles instead.
+"""
+import hashlib
+import logging
+import re
+import time
+from pathlib import Path
+
+from django.template import TemplateDoesNotExist, engines
+from django.template.loaders import cached
+
+from .content import HOMEPAGE_FRAGMENTS, get_scope_version
+
+logger = logging.getLogger(__name__)
+
+INCLUDE_RE = re.compile(
+    r"{#[^\n]*?#}|{%\s*comment\s*%}.*?{%\s*endcomment\s*%}"
+    r"|{%\s*include\s+(?P<quote>['\"])(?P<name>[^'\"]+)(?P=quote)\s*%}",
+    re.S,
+)
+INHERITANCE_RE = re.compile(r'{%\s*(extends|block)\b')
+
+# Templates whose include chains are deeper than this are surely recursive
+MAX_INLINE_DEPTH = 10
+
+WARM_TEMPLATES = ('base/base.html', 'pages/index.html', 'pages/index_lazy.html', 'pages/emailsent.html')
+
+TEMPLATES_VERSION_CHECK_INTERVAL = 1.0
+
+
+class InliningCachedLoader(cached.Loader):
+    def __init__(self, engine, loaders):
+        super().__init__(engine, loaders)
+        self.templates_version = None
+        self.version_checked_at = float('-inf')
+
+    def get_template(self, template_name, skip=None):
+        self.check_templates_version()
+        return super().get_template(template_name, skip)
+
+    def check_templates_version(self):
+        """Drop compiled templates once the ``templates`` scope is bumped."""
+        now = time.monotonic()
+        if now - self.version_checked_at < TEMPLATES_VERSION_CHECK_INTERVAL:
+            return
+        self.version_checked_at = now
+        version = get_scope_version('templates')
+        if version != self.templates_version:
+            if self.templates_version is not None:
+                self.reset()
+            self.templates_version = version
+
+    def get_contents(self, origin):
+        return self.inline_includes(super().get_contents(origin))
+
+    def inline_includes(self, source, depth=0):
+        def inline(match):
+            if match['name'] is None or depth >= MAX_INLINE_DEPTH:
+                return match[0]
+            included = self.project_source(match['name'])
+            if included is None or INHERITANCE_RE.search(included):
+                return match[0]
+            inlined = self.inline_includes(included, depth + 1)
+            if match['name'] in HOMEPAGE_FRAGMENTS:
+                digest = hashlib.md5(inlined.encode(), usedforsecurity=False).hexdigest()
+                inlined = (
+                    f"{{% load fragments %}}{{% cached_fragment '{match['name']}' '{digest}' %}}"
+                    f"{inlined}{{% endcached_fragment %}}"
+                )
+            # Keep the section measurable for lit_app.profiling
+            return (
+                f"{{% load profiling %}}{{% timed_section '{match['name']}' %}}"
+                f"{inlined}{{% endtimed_section %}}"
+            )
+        return INCLUDE_RE.sub(inline, source)
+
+    def project_source(self, template_name):
+        """Source of ``template_name`` if it resolves to a project template dir."""
+        for origin in self.get_template_sources(template_name):
+            try:
+                contents = origin.loader.get_contents(origin)
+            except TemplateDoesNotExist:
+                continue
+            path = Path(origin.name)
+            if any(path.is_relative_to(directory) for directory in self.engine.dirs):
+                return contents
+            return None
+        return None
+
+
+def warm_template_cache(names=WARM_TEMPLATES):
+    """Compile ``names`` into the cached loader ahead of the first request."""
+    try:
+        for engine in engines.all():
+            for name in names:
+                engine.get_template(name)
+    except Exception:
+        logger.exception('Warming the template cache failed; templates will compile on first use')
@@ -0,0 +1,65 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from lit_app.assets import CRITICAL_BUNDLE, bundle_path, critical_css, defer_stylesheets
+
+register = template.Library()
+
+
+class BundleNode(template.Node):
+    def __init__(self, name, nodelist):
+        self.name = name
+        self.nodelist = nodelist
+
+    def render(self, context):
+        path = bundle_path(self.name) if settings.ASSET_BUNDLES else None
+        if path is None:
+            return self.nodelist.render(context)
+        if self.name.endswith('.css'):
+            return format_html('<link rel="stylesheet" href="{}" type="text/css">', static(path))
+        return format_html('<script src="{}"></script>', static(path))
+
+
+@register.tag
+def bundle(parser, token):
+    """Serve the enclosed local stylesheets or scripts as one built bundle.
+
+    ``{% bundle 'site.css' %}...{% endbundle %}`` renders its contents
+    unchanged until ``python manage.py build_assets`` has built the bundle,
+    and always when ``settings.ASSET_BUNDLES`` is off.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2 or bits[1][0] not in '\'"' or bits[1][0] != bits[1][-1]:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes one quoted bundle name")
+    nodelist = parser.parse(('endbundle',))
+    parser.delete_first_token()
+    return BundleNode(bits[1][1:-1], nodelist)
+
+
+class DeferredStylesNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        content = self.nodelist.render(context)
+        path = bundle_path(CRITICAL_BUNDLE) if settings.ASSET_BUNDLES else None
+        if path is None:
+            return content
+        return format_html('<style>{}</style>', mark_safe(critical_css(path))) + defer_stylesheets(content)
+
+
+@register.tag
+def deferred_styles(parser, token):
+    """Inline the critical CSS and load the enclosed stylesheets without blocking.
+
+    Renders its contents unchanged until ``build_assets`` has extracted the
+    critical CSS, since deferring without it would flash unstyled content.
+    """
+    if len(token.split_contents()) != 1:
+        raise template.TemplateSyntaxError("'deferred_styles' takes no arguments")
+    nodelist = parser.parse(('enddeferred_styles',))
+    parser.delete_first_token()
+    return DeferredStylesNode(nodelist)
@@ -0,0 +1,67 @@
+import hashlib
+
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+
+from lit_app.content import HOMEPAGE_FRAGMENTS, get_scope_version, section_scope
+from lit_app.profiling import record_cache
+
+register = template.Library()
+
+FRAGMENT_CACHE_KEY = 'lit_app:fragment:{digest}'
+# Keys change whenever the content does, so entries only need evicting for space
+FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def fragment_key(template_name, source_digest, context):
+    """Cache key for ``template_name`` rendered with ``context``.
+
+    Derived from everything the fragment shows: the inlined template source,
+    the static files manifest, the ``templates``/``images``/section scope
+    versions and the primary key and ``updated_at`` of each displayed row.
+    """
+    names = HOMEPAGE_FRAGMENTS[template_name]
+    parts = [template_name, source_digest, getattr(staticfiles_storage, 'manifest_hash', '')]
+    for scope in ['templates', 'images', *map(section_scope, names)]:
+        parts.append(f'{scope}={get_scope_version(scope)}')
+    for name in names:
+        value = context.get(name)
+        rows = value if isinstance(value, (list, tuple)) else () if value is None else (value,)
+        parts.append(f'{name}=' + ','.join(f'{row.pk}@{row.updated_at.isoformat()}' for row in rows))
+    digest = hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest()
+    return FRAGMENT_CACHE_KEY.format(digest=digest)
+
+
+class CachedFragmentNode(template.Node):
+    def __init__(self, template_name, source_digest, nodelist):
+        self.template_name = template_name
+        self.source_digest = source_digest
+        self.nodelist = nodelist
+
+    def render(self, context):
+        key = fragment_key(self.template_name, self.source_digest, context)
+        content = cache.get(key)
+        record_cache(f'fragment-{self.template_name.rsplit("/", 1)[-1].removesuffix(".html")}', content is not None)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, FRAGMENT_CACHE_TIMEOUT)
+        return content
+
+
+@register.tag
+def cached_fragment(parser, token):
+    """Cache the enclosed markup as homepage fragment ``template_name``.
+
+    ``InliningCachedLoader`` wraps each inlined include listed in
+    ``HOMEPAGE_FRAGMENTS`` in one, passing a digest of the inlined source.
+    """
+    bits = token.split_contents()
+    if len(bits) != 3 or any(bit[0] not in '\'"' or bit[0] != bit[-1] for bit in bits[1:]):
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a quoted template name and source digest")
+    template_name, source_digest = (bit[1:-1] for bit in bits[1:])
+    if template_name not in HOMEPAGE_FRAGMENTS:
+        raise template.TemplateSyntaxError(f"'{template_name}' is not in HOMEPAGE_FRAGMENTS")
+    nodelist = parser.parse(('endcached_fragment',))
+    parser.delete_first_token()
+    return CachedFragmentNode(template_name, source_digest, nodelist)
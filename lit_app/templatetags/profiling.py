@@ -0,0 +1,30 @@
+from django import template
+
+from lit_app.profiling import section_timer
+
+register = template.Library()
+
+
+class TimedSectionNode(template.Node):
+    def __init__(self, name, nodelist):
+        self.name = name
+        self.nodelist = nodelist
+
+    def render(self, context):
+        with section_timer(self.name):
+            return self.nodelist.render(context)
+
+
+@register.tag
+def timed_section(parser, token):
+    """Time the enclosed markup as section ``name`` for sampled requests.
+
+    ``InliningCachedLoader`` wraps every inlined ``{% include %}`` in one, so
+    per-section render times survive inlining.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2 or bits[1][0] not in '\'"' or bits[1][0] != bits[1][-1]:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes one quoted section name")
+    nodelist = parser.parse(('endtimed_section',))
+    parser.delete_first_token()
+    return TimedSectionNode(bits[1][1:-1], nodelist)
@@ -0,0 +1,61 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from lit_app.images import available_derivatives
+
+register = template.Library()
+
+
+@register.filter
+def srcset(fieldfile):
+    """``srcset`` value listing the original-format derivatives of an image."""
+    return ', '.join(f'{url} {width}w' for url, width in available_derivatives(fieldfile))
+
+
+@register.filter
+def webp_srcset(fieldfile):
+    """``srcset`` value listing the WebP derivatives of an image."""
+    return ', '.join(f'{url} {width}w' for url, width in available_derivatives(fieldfile, '.webp'))
+
+
+@register.simple_tag
+def picture(fieldfile, sizes='100vw', **attrs):
+    """Render an uploaded image as a ``<picture>`` with WebP and fallback srcsets.
+
+    Extra keyword arguments become attributes of the ``<img>``, e.g.
+    ``{% picture service.image alt=service.title %}``. Images without
+    derivatives (small originals, or not generated yet) render as a plain
+    ``<img>`` exactly as before.
+    """
+    if not fieldfile:
+        return ''
+    img_attrs = format_html_join('', ' {}="{}"', attrs.items())
+    fallback, webp = srcset(fieldfile), webp_srcset(fieldfile)
+    if not webp:
+        return format_html('<img src="{}"{}>', fieldfile.url, img_attrs)
+    fallback_attrs = format_html(' srcset="{}" sizes="{}"', fallback, sizes) if fallback else ''
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}"{}{}></picture>',
+        webp, sizes, fieldfile.url, fallback_attrs, img_attrs,
+    )
+
+
+@register.simple_tag
+def responsive_background(fieldfile, selector):
+    """Emit a ``<style>`` block giving ``selector`` a width-appropriate background.
+
+    Phones get the smallest derivative and each ``min-width`` breakpoint steps
+    up to the next one; the original is used above the largest derivative.
+    """
+    if not fieldfile:
+        return ''
+    derivatives = available_derivatives(fieldfile)
+    urls = [url for url, _ in derivatives] + [fieldfile.url]
+    rules = [format_html('{}{{background-image:url("{}")}}', selector, urls[0])]
+    for (_, width), url in zip(derivatives, urls[1:]):
+        rules.append(format_html(
+            '@media (min-width:{}px){{{}{{background-image:url("{}")}}}}', width + 1, selector, url,
+        ))
+    return format_html('<style>{}</style>', mark_safe(''.join(rules)))
@@ -1,32 +1,35 @@
+from functools import lru_cache
+
 from django import template
 from django.utils.safestring import mark_safe
-import re
+
+from lit_app.rich_text import strip_outer_wrapper
 
 register = template.Library()
 
+# Values up to this many characters are memoized; longer ones (full CKEditor
+# bodies) are scanned every time so the memo stays small.
+MEMO_MAX_LENGTH = 4096
+MEMO_SIZE = 256
+
+_strip_outer_wrapper_memo = lru_cache(maxsize=MEMO_SIZE)(strip_outer_wrapper)
+
 
 @register.filter(is_safe=True)
 def strip_outer_p(value):
     """Remove a single outer <p>...</p> wrapper from the given HTML string.
 
-    This is intentionally conservative: it only removes one exact outer
-    <p>...</p> pair (optionally with attributes on the opening tag) and
-    preserves the rest of the HTML unchanged.
+    This is intentionally conservative: it only removes one outer <p> or
+    <div> (optionally with attributes on the opening tag) that encloses the
+    whole value, and preserves the rest of the HTML unchanged.
 
     Use only for subtitle fields placed inside <h6> elements to avoid
-    invalid HTML such as <h6><p>..</p></h6>.
+    invalid HTML such as <h6><p>..</p></h6>. Model fields are better served
+    by their precomputed ``*_html`` companions (see ``lit_app.rich_text``).
     """
     if not value:
         return value
-
-    # Regex to match an opening <p> or <div> (with optional attributes) and closing
-    # tag wrapping the entire string. This handles the common CKEditor behavior of
-    # wrapping inline content in a block-level tag. It's intentionally conservative
-    # and only removes a single outer wrapper when it spans the whole value.
-    pattern = r"^\s*<(p|div)(?:\s+[^>]*)?>([\s\S]*?)</\1>\s*$"
-    m = re.match(pattern, str(value), flags=re.IGNORECASE)
-    if m:
-        # inner content is in group 2 when capturing the tag name
-        inner = m.group(2)
-        return mark_safe(inner)
-    return mark_safe(value)
+    value = str(value)
+    if len(value) > MEMO_MAX_LENGTH:
+        return mark_safe(strip_outer_wrapper(value))
+    return mark_safe(_strip_outer_wrapper_memo(value))
@@ -1,5 +1,66 @@
-from django.test import TestCase
-from django.template import Template, Context
+import gzip
+import json
+import shutil
+import socket
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+from importlib import import_module
+from importlib.util import find_spec
+from io import BytesIO, StringIO
+from pathlib import Path
+from smtplib import SMTPException
+from unittest import mock, skipUnless
+from urllib.error import URLError
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.template import Context, Engine, Template, engines
+from django.test import AsyncRequestFactory, Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .assets import defer_stylesheets, extract_critical_css, rewrite_css_urls, unused_selectors
+from .content import (
+	HOMEPAGE_FRAGMENTS, ITEM_MODELS, LAZY_SECTIONS, SECTION_MODELS, build_snapshot, bump_scope_version,
+	get_content_version, get_scope_version, get_snapshot,
+)
+from .images import generate_derivatives
+from .mail import deliver_queued_mail
+from .management.commands.benchmark_homepage import flatten, percentiles, retire_everything
+from .management.commands.copy_sqlite_content import sqlite_database
+from .management.commands.loadtest import Command as LoadTestCommand
+from .management.commands.smtp_sink import SinkHandler
+from .models import (
+	AboutSection, ContactSection, ExampleVideo, ExamplesSection, OutboundEmail, PartnerItem, PartnersSection,
+	ServiceItem, ServicesSection,
+)
+from .page_cache import (
+	LATEST_PAGE_KEY, PAGE_CACHE_KEY, PAGE_LOCK_KEY, _rendered_pages, aget_rendered_page, build_version, page_key,
+)
+from .rich_text import render_rich_text
+from .sqlite import tune_sqlite
+from .storage import LenientManifestStaticFilesStorage
+from .template_loaders import warm_template_cache
+from .templatetags.strip_paragraphs import MEMO_MAX_LENGTH, _strip_outer_wrapper_memo, strip_outer_p
+from .views import index, index_async, section_async, send_mail_view_async
+from .youtube import parse_video_id
+
+def clear_caches():
+	# Versions are timestamps, so a fresh one can repeat a previous test's
+	cache.clear()
+	_rendered_pages.clear()
 
 
 class StripOuterPFilterTests(TestCase):
@@ -21,4 +82,890 @@ class StripOuterPFilterTests(TestCase):
 		rendered = tpl.render(ctx).strip()
 		self.assertEqual(rendered, "Plain subtitle")
 
-# Create your tests here.
+	def test_strip_outer_p_handles_div_attributes_and_case(self):
+		self.assertEqual(strip_outer_p(' <DIV class="lead">\n<em>x</em>\n</div>\n'), "\n<em>x</em>\n")
+		self.assertEqual(strip_outer_p("<div><div>a</div></div>"), "<div>a</div>")
+
+	def test_strip_outer_p_leaves_sibling_paragraphs(self):
+		self.assertEqual(strip_outer_p("<p>a</p><p>b</p>"), "<p>a</p><p>b</p>")
+		self.assertEqual(strip_outer_p("<p>a</p>"), "a")
+
+	def test_strip_outer_p_leaves_unmatched_tags(self):
+		for value in ("<p>x", "x</p>", "<p </p>", "<pre>x</pre>", "<p>a</div>"):
+			self.assertEqual(strip_outer_p(value), value)
+
+	def test_strip_outer_p_hostile_input_is_linear(self):
+		value = "<p" + " " * 200000 + "x>"
+		self.assertEqual(strip_outer_p(value), value)
+		self.assertEqual(strip_outer_p("<p>" + "<p" * 100000 + "</p>"), "<p" * 100000)
+
+	def test_strip_outer_p_memoizes_short_values_only(self):
+		_strip_outer_wrapper_memo.cache_clear()
+		strip_outer_p("<p>memo</p>")
+		strip_outer_p("<p>memo</p>")
+		strip_outer_p("<p>" + "x" * MEMO_MAX_LENGTH + "</p>")
+		info = _strip_outer_wrapper_memo.cache_info()
+		self.assertEqual((info.hits, info.currsize), (1, 1))
+
+	def test_strip_outer_p_none_and_empty(self):
+		self.assertIsNone(strip_outer_p(None))
+		self.assertEqual(strip_outer_p(""), "")
+
+
+class HomepageSnapshotTests(TestCase):
+	def setUp(self):
+		clear_caches()
+		AboutSection.objects.create(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		PartnerItem.objects.create(name="Axis", logo="partners/axis.png", order=2)
+		PartnerItem.objects.create(name="Bosch", logo="partners/bosch.png", order=1)
+
+	def test_warm_cache_serves_index_without_queries(self):
+		self.client.get(reverse("index"), secure=True)
+		with self.assertNumQueries(0):
+			response = self.client.get(reverse("index"), secure=True)
+		self.assertContains(response, "About Us")
+
+	def test_snapshot_materializes_ordered_items(self):
+		snapshot = get_snapshot()
+		self.assertIsInstance(snapshot["partners"], tuple)
+		self.assertEqual([p.name for p in snapshot["partners"]], ["Bosch", "Axis"])
+
+	def test_save_invalidates_snapshot(self):
+		version = get_content_version()
+		get_snapshot()
+		with self.captureOnCommitCallbacks(execute=True):
+			AboutSection.objects.update_or_create(pk=AboutSection.objects.get().pk, defaults={"title": "Who We Are"})
+		self.assertGreater(get_content_version(), version)
+		self.assertEqual(get_snapshot()["about"].title, "Who We Are")
+
+	def test_delete_invalidates_snapshot(self):
+		get_snapshot()
+		with self.captureOnCommitCallbacks(execute=True):
+			PartnerItem.objects.get(name="Axis").delete()
+		self.assertEqual([p.name for p in get_snapshot()["partners"]], ["Bosch"])
+
+	def fragment_misses(self):
+		with mock.patch("lit_app.templatetags.fragments.record_cache") as record:
+			response = self.client.get(reverse("index"), secure=True)
+		return response, [call.args[0] for call in record.call_args_list if not call.args[1]]
+
+	def test_edit_rerenders_only_its_fragments(self):
+		PartnersSection.objects.create(title="Partners", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		response, misses = self.fragment_misses()
+		self.assertIn("fragment-services", misses)
+		self.assertContains(response, "partners/bosch.png")
+		partner = PartnerItem.objects.get(name="Axis")
+		partner.order = 0
+		with self.captureOnCommitCallbacks(execute=True):
+			partner.save()
+		self.assertEqual(self.fragment_misses()[1], ["fragment-partners"])
+		with self.captureOnCommitCallbacks(execute=True):
+			PartnerItem.objects.get(name="Bosch").delete()
+		response, misses = self.fragment_misses()
+		self.assertEqual(misses, ["fragment-partners"])
+		self.assertNotContains(response, "partners/bosch.png")
+
+
+class RenderedPageCacheTests(TestCase):
+	def setUp(self):
+		clear_caches()
+		AboutSection.objects.create(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+
+	def test_anonymous_page_is_shareable(self):
+		response = self.client.get(reverse("index"), secure=True)
+		self.assertNotContains(response, "csrfmiddlewaretoken")
+		self.assertNotIn("csrftoken", response.cookies)
+		self.assertFalse(response.has_header("Vary"))
+		self.assertEqual(response["Cache-Control"], "public, max-age=0")
+		self.assertEqual(Client().get(reverse("index"), secure=True).content, response.content)
+
+	def test_contact_form_posts_with_lazily_fetched_token(self):
+		client = Client(enforce_csrf_checks=True)
+		self.assertEqual(client.post(reverse("send_mail"), {"name": "Ada"}, secure=True).status_code, 403)
+		response = client.get(reverse("csrf_token"), secure=True)
+		self.assertIn("no-store", response["Cache-Control"])
+		token = response.json()["token"]
+		response = client.post(
+			reverse("send_mail"), {"name": "Ada"}, secure=True,
+			HTTP_X_CSRFTOKEN=token, HTTP_REFERER="https://testserver/",
+		)
+		self.assertEqual(response.json()["status"], "success")
+
+	def test_repeat_visit_with_etag_is_not_modified(self):
+		response = self.client.get(reverse("index"), secure=True)
+		self.assertEqual(response["ETag"], f'"v{get_content_version()}-{build_version()[0]}"')
+		repeat = self.client.get(reverse("index"), secure=True, HTTP_IF_NONE_MATCH=response["ETag"])
+		self.assertEqual(repeat.status_code, 304)
+
+	def test_new_build_does_not_reuse_previous_pages(self):
+		etag = self.client.get(reverse("index"), secure=True)["ETag"]
+		self.addCleanup(build_version.cache_clear)
+		build_version.cache_clear()
+		_rendered_pages.clear()  # A deploy starts new processes
+		with override_settings(BUILD_VERSION="next"):
+			self.assertIsNone(cache.get(page_key(PAGE_CACHE_KEY, "pages/index.html", version=get_content_version())))
+			self.assertIsNone(cache.get(page_key(LATEST_PAGE_KEY, "pages/index.html")))
+			response = self.client.get(reverse("index"), secure=True, HTTP_IF_NONE_MATCH=etag)
+			self.assertEqual(response.status_code, 200)
+			self.assertEqual(response["ETag"], f'"v{get_content_version()}-next"')
+
+	def test_content_change_serves_new_page(self):
+		etag = self.client.get(reverse("index"), secure=True)["ETag"]
+		with self.captureOnCommitCallbacks(execute=True):
+			AboutSection.objects.update(is_active=False)
+			AboutSection.objects.create(title="Who We Are", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		response = self.client.get(reverse("index"), secure=True, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(response.status_code, 200)
+		self.assertContains(response, "Who We Are")
+
+	def test_locmem_workers_see_edits_once_their_version_expires(self):
+		def worker(name):
+			# Each worker process has its own locmem cache
+			return override_settings(CACHES={"default": {
+				"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": name,
+			}})
+
+		with worker("worker-b"):
+			self.client.get(reverse("index"), secure=True)
+		about = AboutSection.objects.get()
+		about.title = "Who We Are"
+		with worker("worker-a"), self.captureOnCommitCallbacks(execute=True):
+			about.save()
+		with worker("worker-b"):
+			self.assertNotContains(self.client.get(reverse("index"), secure=True), "Who We Are")
+			later = time.time() + settings.CONTENT_CACHE_TIMEOUT + 1
+			with mock.patch("time.time", return_value=later):
+				self.assertContains(self.client.get(reverse("index"), secure=True), "Who We Are")
+			cache.clear()
+
+	def test_clearcache_bumps_content_version(self):
+		version = get_content_version()
+		call_command("clearcache", stdout=StringIO())
+		self.assertGreater(get_content_version(), version)
+
+	def test_clearcache_scopes_and_warms(self):
+		about, images = get_scope_version("section:about"), get_scope_version("images")
+		call_command("clearcache", section=["about"], warm=True, stdout=StringIO())
+		self.assertGreater(get_scope_version("section:about"), about)
+		self.assertEqual(get_scope_version("images"), images)
+		_rendered_pages.clear()
+		with self.assertNumQueries(0):
+			self.client.get(reverse("index"), secure=True)
+
+	@override_settings(LAZY_HOMEPAGE=True)
+	def test_clearcache_warms_lazy_sections(self):
+		call_command("clearcache", warm=True, stdout=StringIO())
+		for template_name in LAZY_SECTIONS.values():
+			self.assertIsNotNone(cache.get(page_key(PAGE_CACHE_KEY, template_name, version=get_content_version())), template_name)
+
+	def test_rebuild_in_progress_serves_previous_page(self):
+		old_etag = self.client.get(reverse("index"), secure=True)["ETag"]
+		about = AboutSection.objects.get()
+		about.title = "Who We Are"
+		with self.captureOnCommitCallbacks(execute=True):
+			about.save()
+		# Another worker holds the render lock for the new version
+		cache.add(page_key(PAGE_LOCK_KEY, "pages/index.html", version=get_content_version()), True)
+		_rendered_pages.clear()
+		with self.assertNumQueries(0):
+			response = self.client.get(reverse("index"), secure=True)
+		self.assertContains(response, "About Us")
+		self.assertEqual(response["ETag"], old_etag)
+
+	@override_settings(LAZY_HOMEPAGE=True)
+	def test_lazy_homepage_fetches_sections_on_demand(self):
+		response = self.client.get(reverse("index"), secure=True)
+		self.assertNotContains(response, "About Us")
+		for name in LAZY_SECTIONS:
+			self.assertContains(response, reverse("section", args=[name]))
+		self.assertContains(response, "?full")
+		self.assertContains(self.client.get(reverse("index") + "?full", secure=True), "About Us")
+
+		section = self.client.get(reverse("section", args=["about"]), secure=True)
+		self.assertContains(section, "About Us")
+		self.assertNotContains(section, "<html")
+		self.assertEqual(section["Cache-Control"], "public, max-age=0")
+		with self.assertNumQueries(0):
+			repeat = self.client.get(reverse("section", args=["about"]), secure=True, HTTP_IF_NONE_MATCH=section["ETag"])
+		self.assertEqual(repeat.status_code, 304)
+		for name in LAZY_SECTIONS:
+			self.assertEqual(self.client.get(reverse("section", args=[name]), secure=True).status_code, 200)
+		self.assertEqual(self.client.get(reverse("section", args=["footer"]), secure=True).status_code, 404)
+
+	@override_settings(STREAM_HOMEPAGE=True)
+	def test_streamed_page_flushes_head_first_and_is_cached(self):
+		response = self.client.get(reverse("index"), secure=True)
+		self.assertTrue(response.streaming)
+		chunks = list(response.streaming_content)
+		self.assertIn(b"</head", chunks[0])
+		self.assertNotIn(b"About Us", chunks[0])
+		self.assertGreater(len(chunks), len(HOMEPAGE_FRAGMENTS))
+		with self.assertNumQueries(0):
+			cached = self.client.get(reverse("index"), secure=True)
+		self.assertFalse(cached.streaming)
+		self.assertEqual(cached.content, b"".join(chunks))
+		_rendered_pages.clear()
+		cache.clear()
+		with override_settings(STREAM_HOMEPAGE=False):
+			self.assertEqual(self.client.get(reverse("index"), secure=True).content, b"".join(chunks))
+
+	@override_settings(STREAM_HOMEPAGE=True)
+	def test_unread_streamed_page_releases_lock_on_close(self):
+		lock_key = page_key(PAGE_LOCK_KEY, "pages/index.html", version=get_content_version())
+		response = index(RequestFactory().get("/", secure=True))
+		self.assertTrue(response.streaming)
+		self.assertTrue(cache.get(lock_key))
+		response.close()  # the client went away before the first chunk
+		self.assertIsNone(cache.get(lock_key))
+
+	@override_settings(STREAM_HOMEPAGE=True)
+	def test_streamed_page_compresses_chunk_by_chunk(self):
+		request = RequestFactory().get("/", secure=True, HTTP_ACCEPT_ENCODING="gzip")
+		response = GZipMiddleware(index)(request)
+		self.assertEqual(response["Content-Encoding"], "gzip")
+		self.assertContains(HttpResponse(gzip.decompress(b"".join(response.streaming_content))), "About Us")
+
+
+@skipUnless(find_spec("fakeredis"), "fakeredis is not installed")
+class RedisCacheTierTests(TestCase):
+	def test_homepage_cached_in_redis(self):
+		caches = {"default": {
+			"BACKEND": "django.core.cache.backends.redis.RedisCache",
+			"LOCATION": "redis://127.0.0.1:6379/0",
+			"OPTIONS": {"connection_class": import_module("fakeredis").FakeConnection},
+		}}
+		with override_settings(CACHES=caches):
+			cache.clear()
+			_rendered_pages.clear()
+			AboutSection.objects.create(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+			self.client.get(reverse("index"), secure=True)
+			_rendered_pages.clear()
+			with self.assertNumQueries(0):
+				self.assertContains(self.client.get(reverse("index"), secure=True), "About Us")
+			cache.clear()
+
+
+class PublishPagesTests(TestCase):
+	def setUp(self):
+		clear_caches()
+		self.root = Path(tempfile.mkdtemp())
+		self.addCleanup(shutil.rmtree, self.root)
+		AboutSection.objects.create(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+
+	def test_command_writes_pages_and_compressed_variants(self):
+		call_command("publish_pages", root=str(self.root), stdout=StringIO())
+		index = self.root / "index.html"
+		self.assertIn(b"About Us", index.read_bytes())
+		self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), index.read_bytes())
+		self.assertTrue((self.root / "email-sent" / "index.html").exists())
+		self.assertEqual([p.name for p in self.root.glob(".*")], [])
+
+	def test_publish_on_save_republishes_after_commit(self):
+		with override_settings(PUBLISH_ON_SAVE=True, PUBLISH_ROOT=str(self.root)):
+			with self.captureOnCommitCallbacks(execute=True):
+				AboutSection.objects.update(is_active=False)
+				AboutSection.objects.create(title="Who We Are", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		self.assertIn(b"Who We Are", (self.root / "index.html").read_bytes())
+
+
+class MailQueueTests(TestCase):
+	def post_contact_form(self):
+		return self.client.post(reverse("send_mail"), {"name": "Ada", "email": "ada@example.com", "message": "Hi"}, secure=True)
+
+	def test_view_queues_without_sending(self):
+		response = self.post_contact_form()
+		self.assertEqual(response.json()["status"], "success")
+		self.assertEqual(len(mail.outbox), 0)
+		queued = OutboundEmail.objects.get()
+		self.assertEqual(queued.status, OutboundEmail.STATUS_PENDING)
+		self.assertIn("Name: Ada", queued.body)
+
+	def test_queueing_failure_is_logged_and_reported(self):
+		with mock.patch("lit_app.views.queue_contact_email", side_effect=RuntimeError("disk full")):
+			with self.assertLogs("lit_app.views", "ERROR") as logs:
+				response = self.post_contact_form()
+		self.assertEqual(response.json()["status"], "error")
+		self.assertIn("RuntimeError: disk full", logs.output[0])
+
+	def test_worker_drains_queue(self):
+		self.post_contact_form()
+		self.post_contact_form()
+		call_command("send_queued_mail", stdout=StringIO())
+		self.assertEqual(len(mail.outbox), 2)
+		self.assertEqual(mail.outbox[0].subject, "New Contact Form Submission from Ada")
+		self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+
+	def test_overlapping_workers_never_send_twice(self):
+		for _ in range(3):
+			self.post_contact_form()
+		send = EmailMessage.send
+		overlapping = []
+
+		def send_while_another_worker_runs(message, *args, **kwargs):
+			if not overlapping:
+				overlapping.append(deliver_queued_mail())
+			return send(message, *args, **kwargs)
+
+		with mock.patch.object(EmailMessage, "send", autospec=True, side_effect=send_while_another_worker_runs):
+			self.assertEqual(deliver_queued_mail(), (3, 0))
+		self.assertEqual(overlapping, [(0, 0)])
+		self.assertEqual(len(mail.outbox), 3)
+
+	@override_settings(MAIL_QUEUE_MAX_ATTEMPTS=2)
+	def test_failures_back_off_then_dead_letter(self):
+		self.post_contact_form()
+		with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=SMTPException("down")):
+			self.assertEqual(deliver_queued_mail(), (0, 1))
+			queued = OutboundEmail.objects.get()
+			self.assertEqual(queued.status, OutboundEmail.STATUS_PENDING)
+			self.assertEqual(deliver_queued_mail(), (0, 0))  # not due yet
+			OutboundEmail.objects.update(next_attempt_at=queued.created_at)
+			self.assertEqual(deliver_queued_mail(), (0, 1))
+		queued.refresh_from_db()
+		self.assertEqual(queued.status, OutboundEmail.STATUS_DEAD)
+		self.assertIn("down", queued.last_error)
+
+
+class AsyncViewTests(TestCase):
+	def setUp(self):
+		clear_caches()
+		self.factory = AsyncRequestFactory()
+
+	async def test_index_async_renders_snapshot(self):
+		await AboutSection.objects.acreate(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		response = await index_async(self.factory.get("/", secure=True))
+		self.assertContains(response, "About Us")
+		self.assertIn("ETag", response)
+
+	@override_settings(STREAM_HOMEPAGE=True)
+	async def test_index_async_streams_with_async_iterator(self):
+		await AboutSection.objects.acreate(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		response = await index_async(self.factory.get("/", secure=True))
+		self.assertTrue(response.is_async)
+		chunks = [chunk async for chunk in response.streaming_content]
+		self.assertIn(b"</head", chunks[0])
+		self.assertIn(b"About Us", b"".join(chunks))
+		self.assertEqual((await aget_rendered_page("pages/index.html", get_content_version()))[1], b"".join(chunks))
+
+	async def test_send_mail_view_async_queues(self):
+		response = await send_mail_view_async(self.factory.post("/send-mail/", {"name": "Ada"}))
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(await OutboundEmail.objects.acount(), 1)
+
+
+@override_settings(CACHES={"default": {
+	"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "lit_app_test_cache",
+}})
+class DatabaseCacheAsyncViewTests(TestCase):
+	"""Async views with CACHE_TIER=db, where every cache call is a query."""
+
+	def setUp(self):
+		call_command("createcachetable", verbosity=0)
+		_rendered_pages.clear()
+		# Make the template loader check the templates version again
+		engines["django"].engine.template_loaders[0].version_checked_at = float("-inf")
+		AboutSection.objects.create(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		self.factory = AsyncRequestFactory()
+		self.editor = User.objects.create_user("editor")
+
+	def editor_request(self):
+		request = self.factory.get("/", secure=True)
+		request.COOKIES[settings.SESSION_COOKIE_NAME] = "session"
+		request.user = self.editor
+		return request
+
+	async def test_index_async_renders_in_a_thread(self):
+		for stream in (False, True):
+			for request in (self.factory.get("/", secure=True), self.editor_request()):
+				_rendered_pages.clear()
+				await cache.aclear()
+				with self.subTest(stream=stream, editor=hasattr(request, "user")), override_settings(STREAM_HOMEPAGE=stream):
+					response = await index_async(request)
+					if stream:
+						content = b"".join([chunk async for chunk in response.streaming_content])
+					else:
+						content = response.content
+					self.assertIn(b"About Us", content)
+
+	async def test_section_async_renders_in_a_thread(self):
+		response = await section_async(self.factory.get("/sections/about/"), "about")
+		self.assertContains(response, "About Us")
+
+
+def stored_image(name, size):
+	buffer = BytesIO()
+	Image.new("RGB", size, "orange").save(buffer, "JPEG")
+	return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+class ResponsiveImageTests(TestCase):
+	def setUp(self):
+		clear_caches()
+		media_root = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, media_root)
+		override = override_settings(MEDIA_ROOT=media_root)
+		override.enable()
+		self.addCleanup(override.disable)
+
+	def test_save_generates_width_and_webp_derivatives(self):
+		name = stored_image("services/cctv.jpg", (1000, 500))
+		with self.captureOnCommitCallbacks(execute=True):
+			ServiceItem.objects.create(title="CCTV", description="<p>x</p>", image=name)
+		for derivative in ("cctv-480w.jpg", "cctv-480w.webp", "cctv-960w.jpg", "cctv-960w.webp"):
+			self.assertTrue(default_storage.exists(f"services/{derivative}"), derivative)
+		self.assertFalse(default_storage.exists("services/cctv-1440w.jpg"))
+		with default_storage.open("services/cctv-480w.jpg") as f:
+			self.assertEqual(Image.open(f).size, (480, 240))
+		self.assertEqual(generate_derivatives(name), [])
+
+	def test_up_to_date_narrow_image_is_not_decoded(self):
+		name = stored_image("services/cctv.jpg", (1000, 500))
+		self.assertEqual(len(generate_derivatives(name)), 4)
+		with mock.patch("lit_app.images.ImageOps.exif_transpose") as transpose:
+			self.assertEqual(generate_derivatives(name), [])
+		transpose.assert_not_called()
+
+	def test_replaced_upload_loses_its_derivatives(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			item = ServiceItem.objects.create(title="CCTV", description="<p>x</p>", image=stored_image("services/old.jpg", (1000, 500)))
+		self.assertTrue(default_storage.exists("services/old-480w.webp"))
+		item.image = stored_image("services/new.jpg", (1000, 500))
+		with self.captureOnCommitCallbacks(execute=True):
+			item.save()
+		self.assertFalse(default_storage.exists("services/old-480w.jpg"))
+		self.assertFalse(default_storage.exists("services/old-480w.webp"))
+		self.assertTrue(default_storage.exists("services/new-480w.webp"))
+
+	def test_backfill_command_uses_process_pool(self):
+		ServiceItem.objects.create(title="CCTV", description="<p>x</p>", image=stored_image("services/cctv.jpg", (1000, 500)))
+		out = StringIO()
+		call_command("generate_image_derivatives", workers=2, stdout=out)
+		self.assertIn("4 derivative(s) written, 0 error(s)", out.getvalue())
+		call_command("generate_image_derivatives", workers=2, stdout=out)
+		self.assertIn("[SKIP] services/cctv.jpg: up to date", out.getvalue())
+
+	def test_picture_tag_renders_srcsets(self):
+		name = stored_image("services/cctv.jpg", (1000, 500))
+		generate_derivatives(name)
+		item = ServiceItem(title="CCTV", image=name)
+		rendered = Template("{% load responsive_images %}{% picture item.image alt=item.title %}").render(Context({"item": item}))
+		self.assertIn('<source type="image/webp" srcset="/media/services/cctv-480w.webp 480w, /media/services/cctv-960w.webp 960w"', rendered)
+		self.assertIn('srcset="/media/services/cctv-480w.jpg 480w, /media/services/cctv-960w.jpg 960w"', rendered)
+		self.assertIn('alt="CCTV"', rendered)
+
+	def test_picture_tag_falls_back_to_plain_img(self):
+		item = ServiceItem(title="Logo", image=stored_image("services/logo.jpg", (200, 100)))
+		rendered = Template("{% load responsive_images %}{% picture item.image alt=item.title %}").render(Context({"item": item}))
+		self.assertEqual(rendered, '<img src="/media/services/logo.jpg" alt="Logo">')
+
+
+def youtube_thumbnail():
+	buffer = BytesIO()
+	Image.new("RGB", (480, 360), "orange").save(buffer, "JPEG")
+	buffer.seek(0)
+	return buffer
+
+
+class YouTubeFacadeTests(TestCase):
+	def setUp(self):
+		clear_caches()
+		media_root = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, media_root)
+		override = override_settings(MEDIA_ROOT=media_root)
+		override.enable()
+		self.addCleanup(override.disable)
+
+	def test_video_id_parsed_from_any_youtube_url(self):
+		for url in (
+			"https://www.youtube.com/watch?v=i5n6OMiVgEU&t=42s",
+			"https://youtu.be/i5n6OMiVgEU?si=abc",
+			"https://www.youtube-nocookie.com/embed/i5n6OMiVgEU?rel=0&modestbranding=1",
+			"https://m.youtube.com/shorts/i5n6OMiVgEU",
+		):
+			self.assertEqual(parse_video_id(url), "i5n6OMiVgEU", url)
+		for url in ("https://www.youtube.com/channel/UCXq_QNtvHMJQCqChthZs6VA", "https://vimeo.com/i5n6OMiVgEU", ""):
+			self.assertIsNone(parse_video_id(url), url)
+		with self.assertRaises(ValidationError):
+			ExampleVideo(youtube_url="https://vimeo.com/12345").full_clean()
+
+	def test_command_fetches_poster_and_section_renders_facade(self):
+		ExamplesSection.objects.create(title="Examples", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		with mock.patch("lit_app.youtube.urlopen", side_effect=lambda *args, **kwargs: youtube_thumbnail()) as fetch:
+			with self.captureOnCommitCallbacks(execute=True):
+				video = ExampleVideo.objects.create(youtube_url="https://youtu.be/i5n6OMiVgEU")
+			# Saving never goes to the network
+			self.assertEqual((fetch.call_count, video.poster.name), (0, ""))
+			with self.captureOnCommitCallbacks(execute=True):
+				call_command("fetch_video_posters", stdout=StringIO())
+			video.refresh_from_db()
+			self.assertEqual(video.video_id, "i5n6OMiVgEU")
+			self.assertEqual(video.poster.name, "examples/youtube-i5n6OMiVgEU.jpg")
+			with default_storage.open(video.poster.name) as f:
+				self.assertEqual(Image.open(f).size, (480, 270))
+
+			video.youtube_url = "https://www.youtube.com/watch?v=o36rO2BBWKE"
+			with self.captureOnCommitCallbacks(execute=True):
+				video.save()
+				call_command("fetch_video_posters", stdout=StringIO())
+			video.refresh_from_db()
+			self.assertEqual(fetch.call_count, 2)
+			self.assertEqual(video.poster.name, "examples/youtube-o36rO2BBWKE.jpg")
+			self.assertFalse(default_storage.exists("examples/youtube-i5n6OMiVgEU.jpg"))
+
+		response = self.client.get(reverse("section", args=["examples"]), secure=True)
+		self.assertNotContains(response, "<iframe")
+		self.assertContains(response, 'href="https://www.youtube.com/watch?v=o36rO2BBWKE"')
+		self.assertContains(response, 'data-embed-url="https://www.youtube-nocookie.com/embed/o36rO2BBWKE?autoplay=1')
+		self.assertContains(response, 'src="/media/examples/youtube-o36rO2BBWKE.jpg"')
+
+	def test_uploaded_poster_is_kept_and_outage_is_not_an_error(self):
+		video = ExampleVideo.objects.create(youtube_url="https://youtu.be/i5n6OMiVgEU")
+		with mock.patch("lit_app.youtube.urlopen", side_effect=URLError("offline")):
+			out = StringIO()
+			call_command("fetch_video_posters", stdout=out)
+			self.assertIn("0 poster(s) fetched, 1 error(s)", out.getvalue())
+		video.poster = stored_image("examples/custom.jpg", (640, 360))
+		video.save()
+		out = StringIO()
+		call_command("fetch_video_posters", force=True, stdout=out)
+		self.assertIn("[SKIP]", out.getvalue())
+
+
+class OptimizeStaticImagesTests(TestCase):
+	def setUp(self):
+		self.root = Path(tempfile.mkdtemp())
+		self.addCleanup(shutil.rmtree, self.root)
+		(self.root / "carousel" / "bkp").mkdir(parents=True)
+		image = Image.new("RGB", (64, 64), "orange")
+		exif = Image.Exif()
+		exif[0x010E] = "x" * 4000  # bulky ImageDescription metadata
+		image.save(self.root / "carousel" / "a.jpg", "JPEG", quality=100, exif=exif)
+		shutil.copy(self.root / "carousel" / "a.jpg", self.root / "carousel" / "bkp" / "a.jpg")
+		with Image.open(self.root / "carousel" / "a.jpg") as original:
+			self.quantization = original.quantization
+
+	def optimize(self, *args):
+		out = StringIO()
+		call_command("optimize_static_images", "--path", str(self.root), "--workers", "1", *args, stdout=out)
+		return out.getvalue()
+
+	def test_recompresses_strips_metadata_and_reports(self):
+		before = (self.root / "carousel" / "a.jpg").stat().st_size
+		output = self.optimize()
+		self.assertIn("carousel/a.jpg = carousel/bkp/a.jpg", output)
+		self.assertIn("carousel: ", output)
+		self.assertLess((self.root / "carousel" / "a.jpg").stat().st_size, before)
+		with Image.open(self.root / "carousel" / "a.jpg") as optimized:
+			self.assertNotIn(0x010E, optimized.getexif())
+			self.assertEqual(optimized.quantization, self.quantization)
+		self.assertTrue((self.root / "carousel" / "a.jpg.webp").exists())
+
+	def test_siblings_of_same_stem_do_not_collide(self):
+		Image.new("RGB", (64, 64), "navy").save(self.root / "carousel" / "a.png")
+		self.optimize()
+		with Image.open(self.root / "carousel" / "a.png.webp") as png, Image.open(self.root / "carousel" / "a.jpg.webp") as jpg:
+			self.assertNotEqual(png.convert("RGB").getpixel((0, 0)), jpg.convert("RGB").getpixel((0, 0)))
+
+	def test_manifest_skips_unchanged_files(self):
+		self.optimize()
+		self.assertIn("Optimizing 0 of 2 image(s)", self.optimize())
+
+	def test_dry_run_writes_nothing(self):
+		before = (self.root / "carousel" / "a.jpg").read_bytes()
+		self.optimize("--dry-run")
+		self.assertEqual((self.root / "carousel" / "a.jpg").read_bytes(), before)
+		self.assertFalse((self.root / "carousel" / "a.jpg.webp").exists())
+
+
+class LenientManifestStorageTests(TestCase):
+	def setUp(self):
+		self.root = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.root)
+		self.storage = LenientManifestStaticFilesStorage(location=self.root, base_url="/static/")
+
+	def test_missing_manifest_entry_falls_back_to_plain_url(self):
+		self.assertEqual(self.storage.url("css/style.css"), "/static/css/style.css")
+
+	def test_collected_file_gets_hashed_url(self):
+		self.storage.save("css/style.css", ContentFile(b"body{color:red}"))
+		self.assertRegex(self.storage.url("css/style.css"), r"^/static/css/style\.[0-9a-f]{12}\.css$")
+
+
+class AssetBundleTests(TestCase):
+	template = "{% load static assets %}{% bundle 'site.css' %}<link href=\"{% static 'css/style.css' %}\">{% endbundle %}"
+
+	def setUp(self):
+		self.root = Path(tempfile.mkdtemp())
+		self.addCleanup(shutil.rmtree, self.root)
+		settings_override = override_settings(STATICFILES_DIRS=[settings.STATICFILES_DIRS[0], self.root])
+		settings_override.enable()
+		self.addCleanup(settings_override.disable)
+
+	def test_css_urls_are_rewritten_relative_to_bundle(self):
+		css = 'a{background:url(owl.video.play.png)}b{src:url("../../fonts/x.woff")}c{background:url(data:image/png;base64,AA)}'
+		self.assertEqual(
+			rewrite_css_urls(css, "css/owlcarousel/owl.carousel.css", "dist"),
+			'a{background:url("../css/owlcarousel/owl.video.play.png")}b{src:url("../fonts/x.woff")}'
+			'c{background:url(data:image/png;base64,AA)}',
+		)
+
+	def test_unused_selectors_ignore_element_selectors(self):
+		css = "/* .gone */ body{margin:0} .used a, .gone{color:red} @media (min-width:1px){#nav{top:0}}"
+		self.assertEqual(unused_selectors(css, {"used", "nav"}), [".gone"])
+
+	def test_block_renders_sources_until_built(self):
+		rendered = Template(self.template).render(Context())
+		self.assertEqual(rendered, '<link href="/static/css/style.css">')
+
+	def test_built_bundle_replaces_block(self):
+		call_command("build_assets", "--root", str(self.root), stdout=StringIO())
+		built = list((self.root / "dist").glob("site.*.css"))
+		self.assertEqual(len(built), 1)
+		rendered = Template(self.template).render(Context())
+		self.assertEqual(rendered, f'<link rel="stylesheet" href="/static/dist/{built[0].name}" type="text/css">')
+		with override_settings(ASSET_BUNDLES=False):
+			self.assertNotIn("dist/", Template(self.template).render(Context()))
+
+	def test_manifest_is_found_once_per_build(self):
+		call_command("build_assets", "--root", str(self.root), stdout=StringIO())
+		Template(self.template).render(Context())
+		with mock.patch("lit_app.assets.finders.find") as find:
+			self.assertIn("dist/", Template(self.template).render(Context()))
+		find.assert_not_called()
+
+	def test_critical_css_keeps_rules_matching_markup(self):
+		css = "body{margin:0}.hero a:hover{color:red}.footer{color:blue}table{border:0}@font-face{font-family:x}@media (max-width:640px){.hero{top:0}.footer{top:0}}"
+		self.assertEqual(
+			extract_critical_css(css, '<div class="hero"><a href="#">x</a></div>'),
+			"body{margin:0}.hero a:hover{color:red}@media (max-width:640px){.hero{top:0}}",
+		)
+
+	def test_stylesheets_become_preloads_with_noscript_fallback(self):
+		self.assertEqual(
+			defer_stylesheets('<link rel = "stylesheet" href = "/a.css" >'),
+			'<link rel="preload" as="style" onload="this.onload=null;this.rel=\'stylesheet\'" href = "/a.css" >'
+			'<noscript><link rel = "stylesheet" href = "/a.css" ></noscript>',
+		)
+
+	def test_homepage_inlines_critical_css_once_built(self):
+		self.assertNotIn('rel="preload" as="style"', self.client.get(reverse("index"), secure=True).content.decode())
+		call_command("build_assets", "--root", str(self.root), stdout=StringIO())
+		content = self.client.get(reverse("index"), secure=True).content.decode()
+		self.assertIn("<style>", content.split("</head")[0])
+		self.assertIn('rel="preload" as="style"', content)
+		self.assertNotRegex(content.split("</head")[0], r'<link rel\s*=\s*"stylesheet"(?![^<]*</noscript>)')
+
+
+class InliningCachedLoaderTests(TestCase):
+	def setUp(self):
+		self.root = Path(tempfile.mkdtemp())
+		self.addCleanup(shutil.rmtree, self.root)
+		templates = {
+			"page.html": "<main>{% include 'part.html' %}{% include \"part.html\" with x=2 %}{# {% include 'part.html' %} #}{% include 'base.html' %}</main>",
+			"part.html": "{% load static %}<p>{{ x }}{% include 'leaf.html' %}</p>",
+			"leaf.html": "<i>leaf</i>",
+			"base.html": "{% block b %}base{% endblock %}",
+		}
+		for name, source in templates.items():
+			(self.root / name).write_text(source)
+		self.engine = Engine(dirs=[self.root], libraries={"static": "django.templatetags.static", "profiling": "lit_app.templatetags.profiling"}, loaders=[
+			("lit_app.template_loaders.InliningCachedLoader", ["django.template.loaders.filesystem.Loader"]),
+		])
+
+	def test_static_includes_are_inlined_recursively(self):
+		source = self.engine.get_template("page.html").source
+		self.assertIn(
+			"{% timed_section 'part.html' %}{% load static %}<p>{{ x }}"
+			"{% load profiling %}{% timed_section 'leaf.html' %}<i>leaf</i>{% endtimed_section %}</p>",
+			source,
+		)
+		self.assertIn("{% include \"part.html\" with x=2 %}", source)
+		self.assertIn("{# {% include 'part.html' %} #}", source)
+		self.assertIn("{% include 'base.html' %}", source)
+
+	def test_inlined_template_renders_like_includes(self):
+		rendered = self.engine.get_template("page.html").render(Context({"x": 1}))
+		self.assertEqual(rendered, "<main><p>1<i>leaf</i></p><p>2<i>leaf</i></p>base</main>")
+
+	def test_templates_scope_bump_drops_compiled_templates(self):
+		loader = self.engine.template_loaders[0]
+		self.engine.get_template("page.html")
+		bump_scope_version("templates")
+		loader.version_checked_at = float("-inf")
+		loader.check_templates_version()
+		self.assertEqual(loader.get_template_cache, {})
+
+	def test_warm_up_survives_an_unreachable_cache(self):
+		loader = engines["django"].engine.template_loaders[0]
+		loader.version_checked_at = float("-inf")
+		with mock.patch("lit_app.template_loaders.get_scope_version", side_effect=ConnectionError("cache down")):
+			with self.assertLogs("lit_app.template_loaders", "ERROR") as logs:
+				warm_template_cache(["pages/index.html"])
+		self.assertIn("cache down", logs.output[0])
+
+
+class RenderedRichTextTests(TestCase):
+	def test_save_renders_sanitized_companion_columns(self):
+		about = AboutSection.objects.create(
+			title="About Us",
+			subtitle='<p class="lead">\n  Security   <strong>Systems</strong>\n</p>',
+			description='<p onclick="x()" style="color:red;position:fixed">Hi<script>alert(1)</script></p>',
+		)
+		self.assertEqual(about.subtitle_html, 'Security <strong>Systems</strong>')
+		self.assertEqual(about.description_html, '<p style="color:red">Hi</p>')
+		about.subtitle = "<p>Changed</p>"
+		about.save()
+		about.refresh_from_db()
+		self.assertEqual(about.subtitle_html, "Changed")
+
+	def test_contact_subtitle_keeps_its_wrapper(self):
+		contact = ContactSection.objects.create(subtitle="<p>Call us</p>", google_maps_embed_url="https://maps.example.com")
+		self.assertEqual(contact.subtitle_html, "<p>Call us</p>")
+
+	def test_whitespace_inside_pre_is_kept(self):
+		self.assertEqual(render_rich_text("<p>a\n\n b</p><pre>x\n  y</pre>"), "<p>a b</p><pre>x\n  y</pre>")
+
+	def test_homepage_outputs_companion_html(self):
+		clear_caches()
+		AboutSection.objects.create(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc<script>bad()</script></p>")
+		response = self.client.get(reverse("index"), secure=True)
+		self.assertContains(response, "<h6>Sub</h6>")
+		self.assertNotContains(response, "bad()")
+
+
+class BenchmarkHelperTests(TestCase):
+	def test_percentiles_in_milliseconds(self):
+		summary = percentiles([i / 1000 for i in range(1, 101)])
+		self.assertEqual((summary["n"], summary["p50_ms"], summary["p99_ms"], summary["max_ms"]), (100, 51, 99, 100))
+
+	def test_flatten_keeps_numeric_leaves(self):
+		results = {"meta": {"git_revision": "abc", "debug": False}, "index": {"bytes": {"raw": 10}}}
+		self.assertEqual(flatten(results), {"index.bytes.raw": 10})
+
+	def test_cold_runs_retire_fragments_and_templates(self):
+		clear_caches()
+		scopes = ("section:about", "images", "templates")
+		before = [get_scope_version(scope) for scope in scopes] + [get_content_version()]
+		retire_everything()
+		after = [get_scope_version(scope) for scope in scopes] + [get_content_version()]
+		self.assertTrue(all(new > old for old, new in zip(before, after)), (before, after))
+
+	def test_loadtest_report_counts_non_2xx_as_errors(self):
+		samples = {"GET /": [(0.01, 200), (0.02, 200), (0.03, 503), (0.04, "ConnectionRefusedError")]}
+		report = LoadTestCommand().build_report(samples, 2.0, {"url": "http://127.0.0.1:8000/", "concurrency": 2})
+		stats = report["endpoints"]["GET /"]
+		self.assertEqual((report["throughput_rps"], stats["error_rate"]), (2.0, 0.5))
+		self.assertEqual(stats["outcomes"], {"200": 2, "503": 1, "ConnectionRefusedError": 1})
+
+
+@skipUnless(find_spec("aiosmtpd"), "aiosmtpd is not installed")
+class SmtpSinkTests(TestCase):
+	def setUp(self):
+		from aiosmtpd.controller import Controller
+
+		with socket.socket() as probe:
+			probe.bind(("127.0.0.1", 0))
+			port = probe.getsockname()[1]
+		self.handler = SinkHandler(mock.Mock(), fail_rate=0.0)
+		self.controller = Controller(self.handler, hostname="127.0.0.1", port=port)
+		self.controller.start()
+		self.addCleanup(self.controller.stop)
+		self.email_settings = override_settings(
+			EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+			EMAIL_HOST="127.0.0.1", EMAIL_PORT=port, EMAIL_USE_TLS=False, EMAIL_HOST_USER="",
+		)
+
+	def test_outbox_delivers_to_sink_and_retries_deferrals(self):
+		self.client.post(reverse("send_mail"), {"name": "Ada", "email": "ada@example.com", "message": "Hi"}, secure=True)
+		self.handler.fail_rate = 1.0
+		with self.email_settings:
+			self.assertEqual(deliver_queued_mail(), (0, 1))
+			OutboundEmail.objects.update(next_attempt_at=OutboundEmail.objects.get().created_at)
+			self.handler.fail_rate = 0.0
+			self.assertEqual(deliver_queued_mail(), (1, 0))
+		self.assertEqual((self.handler.accepted, self.handler.deferred), (1, 1))
+
+
+@override_settings(
+	MIDDLEWARE=["lit_app.profiling.ServerTimingMiddleware", *settings.MIDDLEWARE],
+	PROFILING_SAMPLE_RATE=1.0,
+)
+class ServerTimingMiddlewareTests(TestCase):
+	def setUp(self):
+		clear_caches()
+		AboutSection.objects.create(title="About Us", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+
+	def test_sampled_request_reports_queries_sections_and_cache(self):
+		with self.assertLogs("lit_app.profiling", "INFO") as logs:
+			response = self.client.get(reverse("index"), secure=True)
+		timing = response["Server-Timing"]
+		self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+		self.assertIn("tpl-sections-about;dur=", timing)
+		self.assertIn('cache-snapshot;desc="miss"', timing)
+		profile = json.loads(logs.records[0].getMessage())
+		self.assertEqual((profile["path"], profile["status"], profile["cache"]["page"]), ("/", 200, "miss"))
+
+		response = self.client.get(reverse("index"), secure=True)
+		self.assertIn('cache-page;desc="hit"', response["Server-Timing"])
+		self.assertIn('desc="0 queries"', response["Server-Timing"])
+
+	@override_settings(PROFILING_SAMPLE_RATE=0.0)
+	def test_unsampled_request_has_no_header(self):
+		self.assertNotIn("Server-Timing", self.client.get(reverse("index"), secure=True))
+
+
+class SqliteTuningTests(TestCase):
+	def executed_pragmas(self, **settings_overrides):
+		fake = mock.Mock(vendor="sqlite")
+		with override_settings(**settings_overrides):
+			tune_sqlite(sender=None, connection=fake)
+		return [call.args[0] for call in fake.connection.execute.call_args_list]
+
+	def test_production_mode_enables_wal_on_new_connections(self):
+		pragmas = self.executed_pragmas(SQLITE_PRODUCTION=True)
+		self.assertIn("PRAGMA journal_mode = WAL", pragmas)
+		self.assertIn("PRAGMA synchronous = NORMAL", pragmas)
+
+	def test_off_leaves_sqlite_defaults(self):
+		self.assertEqual(self.executed_pragmas(SQLITE_PRODUCTION=False), [])
+
+
+class DatabaseBackendTests(TestCase):
+	# Run with DATABASE_URL=postgres://... too: these and every view test must pass on both backends
+	def test_models_match_migrations(self):
+		call_command("makemigrations", "lit_app", "--check", "--dry-run", stdout=StringIO())
+
+	def test_copy_sqlite_content(self):
+		tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(tmp.cleanup)
+		source = Path(tmp.name) / "source.sqlite3"
+		then = datetime(2024, 5, 1, 12, 30, tzinfo=dt_timezone.utc)
+		with sqlite_database(source, "seed"):
+			call_command("migrate", database="seed", verbosity=0)
+			ServiceItem.objects.using("seed").create(id=41, title="CCTV", description="<p>Cameras</p>")
+			ServiceItem.objects.using("seed").update(description_html="<p>Stored</p>", updated_at=then)
+			OutboundEmail.objects.using("seed").create(subject="Hi", body="x", from_email="a@example.com", to="b@example.com")
+			OutboundEmail.objects.using("seed").update(created_at=then, updated_at=then)
+		self.assertNotIn("seed", connections.settings)
+
+		call_command("copy_sqlite_content", source=str(source), stdout=StringIO())
+		copied = ServiceItem.objects.get()
+		self.assertEqual((copied.id, copied.description_html, copied.updated_at), (41, "<p>Stored</p>", then))
+		self.assertEqual(OutboundEmail.objects.values_list("created_at", "updated_at").get(), (then, then))
+		self.assertGreater(ServiceItem.objects.create(title="Next").id, 41)
+		with self.assertRaisesMessage(CommandError, "pass --replace"):
+			call_command("copy_sqlite_content", source=str(source), stdout=StringIO())
+
+	@skipUnless(connection.vendor == "postgresql", "DATABASE_URL is not a PostgreSQL database")
+	def test_postgresql_backend(self):
+		ServicesSection.objects.create(title="Services", subtitle="<p>Sub</p>", description="<p>Desc</p>")
+		for order, title in ((2, "Fire Alarms"), (1, "CCTV"), (1, "Access Control")):
+			ServiceItem.objects.create(title=title, order=order)
+		# One query per model, items in Meta.ordering with ties in insertion order, as on SQLite
+		with self.assertNumQueries(len(SECTION_MODELS) + len(ITEM_MODELS)):
+			snapshot = build_snapshot()
+		self.assertEqual([item.title for item in snapshot["services"]], ["CCTV", "Access Control", "Fire Alarms"])
+		# Server-side cursors, or plain ones with DATABASE_PGBOUNCER
+		self.assertEqual(len(list(ServiceItem.objects.iterator(chunk_size=1))), 3)
+		clear_caches()
+		self.assertContains(self.client.get(reverse("index"), secure=True), "Fire Alarms")
@@ -1,31 +1,137 @@
-from django.shortcuts import render, redirect
-from django.core.mail import send_mail
+import logging
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http import JsonResponse
+from django.shortcuts import render, redirect
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
 from .forms import ContactForm
-
-from .models import (
-    HeroSection, AboutSection, ServiceItem, ServicesSection,
-    PortfolioSection, PartnerItem, PartnersSection,
-    ExampleVideo, ExamplesSection, ContactSection, FooterSection
+from .content import (
+ aget_content_version, aget_snapshot, get_content_version, get_snapshot, LAZY_SECTIONS
 )
+from .mail import aqueue_contact_email, queue_contact_email
+from .page_cache import (
+    aget_rendered_page, get_rendered_page, not_modified_response, set_page_validators
+)
+from .streaming import astream_template, stream_template
+
+logger = logging.getLogger(__name__)
 
 def index( request ) :
- """Homepage view"""
- context = {
-  'hero': HeroSection.objects.filter(is_active=True).first(),
-  'about': AboutSection.objects.filter(is_active=True).first(),
-  'services_header': ServicesSection.objects.filter(is_active=True).first(),
-  'services': ServiceItem.objects.filter(is_active=True),
-  'portfolio': PortfolioSection.objects.filter(is_active=True).first(),
-  'partners_header': PartnersSection.objects.filter(is_active=True).first(),
-  'partners': PartnerItem.objects.filter(is_active=True),
-  'examples_header': ExamplesSection.objects.filter(is_active=True).first(),
-  'examples': ExampleVideo.objects.filter(is_active=True),
-  'contact': ContactSection.objects.filter(is_active=True).first(),
-  'footer': FooterSection.objects.filter(is_active=True).first(),
- }
- return render( request, 'pages/index.html', context )
+ """Homepage view
+
+ Anonymous visitors are served the cached rendered page for the current
+ content version; signed-in editors always get a fresh, complete render.
+ With settings.STREAM_HOMEPAGE a page that has to be rendered is streamed,
+ a section at a time.
+ """
+ version = get_content_version()
+ editor = is_authenticated( request )
+ response = not_modified_response( request, version )
+ if response is None :
+  if editor :
+   if settings.STREAM_HOMEPAGE :
+    response = page_response( stream_template( 'pages/index.html', get_snapshot( version ), request ) )
+   else :
+    response = render( request, 'pages/index.html', get_snapshot( version ) )
+  else :
+   version, page = get_rendered_page( homepage_template( request ), version, stream = settings.STREAM_HOMEPAGE )
+   response = page_response( page )
+ return set_page_validators( response, version, shared = not editor )
+
+async def index_async( request ) :
+ """Homepage view for ASGI deployments (settings.ASYNC_VIEWS)
+
+ Same behaviour as ``index``, but cache and database lookups are awaited
+ instead of tying up a thread per request. Rendering still runs in a
+ thread, since template tags read the cache synchronously.
+ """
+ version = await aget_content_version()
+ editor = await ais_authenticated( request )
+ response = not_modified_response( request, version )
+ if response is None :
+  if editor :
+   context = await aget_snapshot( version )
+   if settings.STREAM_HOMEPAGE :
+    response = page_response( astream_template( 'pages/index.html', context, request ) )
+   else :
+    response = await sync_to_async( render )( request, 'pages/index.html', context )
+  else :
+   version, page = await aget_rendered_page(
+    homepage_template( request ), version, stream = settings.STREAM_HOMEPAGE )
+   response = page_response( page )
+ return set_page_validators( response, version, shared = not editor )
+
+def page_response( page ) :
+ """``HttpResponse`` for a cached page, ``StreamingHttpResponse`` for one being rendered"""
+ if isinstance( page, bytes ) :
+  return HttpResponse( page )
+ response = StreamingHttpResponse( page )
+ # Ask nginx to pass each chunk on instead of buffering the whole page
+ response[ 'X-Accel-Buffering' ] = 'no'
+ return response
+
+def homepage_template( request ) :
+ """``pages/index_lazy.html`` with settings.LAZY_HOMEPAGE, unless ``?full`` asks for every section"""
+ if settings.LAZY_HOMEPAGE and 'full' not in request.GET :
+  return 'pages/index_lazy.html'
+ return 'pages/index.html'
+
+def section( request, name ) :
+ """One below-the-fold homepage section, for ``pages/index_lazy.html``
+
+ Sections are cached and revalidated like the homepage itself, on the
+ content version, and are the same for every visitor.
+ """
+ template_name = LAZY_SECTIONS.get( name )
+ if template_name is None :
+  raise Http404( f'No homepage section named {name!r}' )
+ version = get_content_version()
+ response = not_modified_response( request, version )
+ if response is None :
+  version, fragment = get_rendered_page( template_name, version )
+  response = HttpResponse( fragment )
+ return set_page_validators( response, version )
+
+async def section_async( request, name ) :
+ """Section view for ASGI deployments (settings.ASYNC_VIEWS)"""
+ template_name = LAZY_SECTIONS.get( name )
+ if template_name is None :
+  raise Http404( f'No homepage section named {name!r}' )
+ version = await aget_content_version()
+ response = not_modified_response( request, version )
+ if response is None :
+  version, fragment = await aget_rendered_page( template_name, version )
+  response = HttpResponse( fragment )
+ return set_page_validators( response, version )
+
+def is_authenticated( request ) :
+ """Check for a signed-in user, touching the session only if there is one
+
+ Reading the session marks the response ``Vary: Cookie``, which would keep
+ shared caches from storing the anonymous homepage.
+ """
+ return settings.SESSION_COOKIE_NAME in request.COOKIES and request.user.is_authenticated
+
+async def ais_authenticated( request ) :
+ """Async counterpart of ``is_authenticated``
+
+ Loading ``request.user`` reads the session from the database, so it has to
+ run in a thread; visitors without a session cookie can be answered directly.
+ """
+ if settings.SESSION_COOKIE_NAME not in request.COOKIES :
+  return False
+ return await sync_to_async( lambda : request.user.is_authenticated )()
+
+@never_cache
+def csrf_token( request ) :
+ """CSRF token for the contact form, fetched once a visitor starts filling it in
+
+ Keeping the token out of the homepage keeps the page identical for every
+ anonymous visitor. ``get_token`` also sets the matching CSRF cookie.
+ """
+ return JsonResponse( { 'token' : get_token( request ) } )
 
 # def blog( request ) :
 #  """Blog page view"""
@@ -58,61 +164,26 @@ def email_sent( request ) :
 # Form handling view (for contact form)
 def send_mail_view(request):
     if request.method == 'POST':
-        # Extract form data directly from POST
-        name = request.POST.get('name', '')
-        email = request.POST.get('email', '')
-        company = request.POST.get('company', '')
-        title = request.POST.get('title', '')
-        phone = request.POST.get('phone', '')
-        address = request.POST.get('address', '')
-        city = request.POST.get('city', '')
-        state = request.POST.get('state', '')
-        zipcode = request.POST.get('zipcode', '')
-        system_of_interest = request.POST.get('systemofinterest', '')
-        message = request.POST.get('message', '')
-        current_customer = request.POST.get('currentcust', 'off')
-        
-        # Compose email
-        subject = f'New Contact Form Submission from {name}'
-        email_message = f"""
-New contact form submission from LIVE i TECH website:
-
-Name: {name}
-Company: {company}
-Title: {title}
-Email: {email}
-Phone: {phone}
-
-Address: {address}
-City: {city}
-State: {state}
-Zip Code: {zipcode}
-
-System of Interest: {system_of_interest}
-Current Customer: {'Yes' if current_customer == 'on' else 'No'}
-
-Comments:
-{message}
-
----
-This email was sent from the LIVE i TECH contact form.
-        """
-        
         try:
-            # Send email
-            send_mail(
-                subject=subject,
-                message=email_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.CONTACT_EMAIL],
-                fail_silently=False,
-            )
+            # Queue the email; send_queued_mail delivers it outside the request
+            queue_contact_email(request.POST)
             return JsonResponse({'status': 'success', 'message': 'Email sent successfully'})
-        except Exception as e:
-            # Log error but still return success to user
-            print(f"Error sending email: {e}")
-            # Return success status so modal shows, but log error on server
+        except Exception:
+            # Log error but still return a JSON status so the modal shows
+            logger.exception('Queueing a contact form email failed')
             return JsonResponse({'status': 'error', 'message': 'There was an issue sending your email. Please try again or contact us directly.'})
     
     # If GET request, redirect to homepage
     return redirect('index')
+
+async def send_mail_view_async(request):
+    """Contact form handler for ASGI deployments (settings.ASYNC_VIEWS)"""
+    if request.method == 'POST':
+        try:
+            await aqueue_contact_email(request.POST)
+            return JsonResponse({'status': 'success', 'message': 'Email sent successfully'})
+        except Exception:
+            logger.exception('Queueing a contact form email failed')
+            return JsonResponse({'status': 'error', 'message': 'There was an issue sending your email. Please try again or contact us directly.'})
+
+    return redirect('index')
@@ -0,0 +1,130 @@
+"""YouTube video IDs and posters for ``ExampleVideo``.
+
+Editors paste whatever YouTube URL they have (``watch?v=``, ``youtu.be``,
+``/embed/``, ``/shorts/``, ``youtube-nocookie.com``...). The canonical
+11-character video ID is parsed from it on save into a read-only companion
+column (``YouTubeVideoIdField``), and the examples section renders a
+click-to-load facade from the ID instead of an ``<iframe>`` per video.
+
+The facade shows a poster stored with the site's own media: YouTube's
+thumbnail, cropped to 16:9 and re-encoded by ``python manage.py
+fetch_video_posters`` (run it after adding videos, or from cron). Saving a
+video never goes to the network, so the admin stays fast and offline
+seeding works; until the command runs the facade shows no poster. Editors
+can upload their own poster instead.
+"""
+import posixpath
+import re
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+from urllib.request import urlopen
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import models
+from PIL import Image, ImageOps
+
+VIDEO_ID_RE = re.compile(r'[A-Za-z0-9_-]{11}')
+YOUTUBE_HOSTS = ('youtube.com', 'youtube-nocookie.com')
+# Path prefixes followed by the video ID
+ID_PATH_PREFIXES = ('embed', 'shorts', 'live', 'v', 'e')
+
+EMBED_URL = 'https://www.youtube-nocookie.com/embed/{video_id}?autoplay=1&rel=0&modestbranding=1'
+WATCH_URL = 'https://www.youtube.com/watch?v={video_id}'
+
+# hqdefault exists for every video; it is 4:3 with the 16:9 frame letterboxed
+THUMBNAIL_URL = 'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'
+THUMBNAIL_TIMEOUT = 10
+POSTER_SIZE = (480, 270)
+# Fetched posters are saved as <prefix><video ID>.jpg under the field's upload_to
+POSTER_PREFIX = 'youtube-'
+
+
+def parse_video_id(url):
+    """The video ID in YouTube URL ``url``, or None if it does not name one."""
+    try:
+        parts = urlsplit(url.strip())
+    except (AttributeError, ValueError):
+        return None
+    host = (parts.hostname or '').lower().removeprefix('www.').removeprefix('m.')
+    segments = [segment for segment in parts.path.split('/') if segment]
+    if host == 'youtu.be':
+        candidate = segments[0] if segments else None
+    elif host in YOUTUBE_HOSTS or host.endswith('.youtube.com'):
+        if segments[:1] == ['watch']:
+            candidate = parse_qs(parts.query).get('v', [None])[0]
+        elif len(segments) >= 2 and segments[0] in ID_PATH_PREFIXES:
+            candidate = segments[1]
+        else:
+            candidate = None
+    else:
+        candidate = None
+    return candidate if candidate and VIDEO_ID_RE.fullmatch(candidate) else None
+
+
+def validate_youtube_url(url):
+    if parse_video_id(url) is None:
+        raise ValidationError('Enter a YouTube video URL (watch, youtu.be, embed or Shorts link).')
+
+
+class YouTubeVideoIdField(models.CharField):
+    """Read-only companion column holding the video ID parsed from ``source``."""
+
+    def __init__(self, source=None, **kwargs):
+        self.source = source
+        kwargs.setdefault('max_length', 11)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        super().__init__(**kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        for key, default in (('max_length', 11), ('editable', False), ('blank', True), ('default', '')):
+            if kwargs.get(key, not default) == default:
+                kwargs.pop(key, None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = parse_video_id(getattr(model_instance, self.source)) or ''
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def needs_poster(video, force=False):
+    """Whether ``video`` has no poster, or a fetched one of a previous video.
+
+    With ``force`` any fetched poster is due; uploaded ones never are.
+    """
+    if not video.video_id:
+        return False
+    if not video.poster:
+        return True
+    # Storage may have suffixed the name; an uploaded poster is never replaced
+    name = posixpath.basename(video.poster.name)
+    return name.startswith(POSTER_PREFIX) and (force or not name.startswith(f'{POSTER_PREFIX}{video.video_id}'))
+
+
+def fetch_poster(video_id):
+    """JPEG bytes of the poster for ``video_id``: its thumbnail, cropped to 16:9."""
+    # lit_app.images imports the models, which import this module
+    from .images import encode
+
+    with urlopen(THUMBNAIL_URL.format(video_id=video_id), timeout=THUMBNAIL_TIMEOUT) as response:
+        image = Image.open(BytesIO(response.read()))
+        image.load()
+    poster = ImageOps.fit(image.convert('RGB'), POSTER_SIZE, Image.LANCZOS)
+    return encode(poster, 'poster.jpg', 'JPEG')
+
+
+def store_poster(video, force=False):
+    """Fetch and save ``video``'s poster if it needs one; return whether it did."""
+    if not needs_poster(video, force):
+        return False
+    content = fetch_poster(video.video_id)
+    if video.poster:
+        video.poster.delete(save=False)
+    video.poster.save(f'{POSTER_PREFIX}{video.video_id}.jpg', ContentFile(content), save=False)
+    video.save(update_fields=['poster', 'updated_at'])
+    return True
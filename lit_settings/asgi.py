@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lit_settings.settings')
 
 application = get_asgi_application()
+
+from lit_app.template_loaders import warm_template_cache  # noqa: E402
+
+warm_template_cache()
@@ -4,11 +4,19 @@ from django.conf import settings
 from django.conf.urls.static import static
 from lit_app import views
 
+# Native async views for ASGI servers, sync views for WSGI
+if settings.ASYNC_VIEWS :
+ index_view, section_view, send_mail_view = views.index_async, views.section_async, views.send_mail_view_async
+else :
+ index_view, section_view, send_mail_view = views.index, views.section, views.send_mail_view
+
 urlpatterns = [
  path( 'admin/', admin.site.urls ),
  path( 'ckeditor5/', include( 'django_ckeditor_5.urls' ) ),
- path( '', views.index, name='index' ),
- path( 'send-mail/', views.send_mail_view, name='send_mail' ),
+ path( '', index_view, name='index' ),
+ path( 'sections/<slug:name>/', section_view, name='section' ),
+ path( 'send-mail/', send_mail_view, name='send_mail' ),
+ path( 'csrf-token/', views.csrf_token, name='csrf_token' ),
  path( 'email-sent/', views.email_sent, name='email_sent' ),
 ]
 
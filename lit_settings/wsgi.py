@@ -5,3 +5,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lit_settings.settings')
 
 application = get_wsgi_application()
+
+from lit_app.template_loaders import warm_template_cache  # noqa: E402
+
+warm_template_cache()
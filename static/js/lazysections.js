@@ -0,0 +1,83 @@
+/*
+	LAZY HOMEPAGE SECTIONS
+	pages/index_lazy.html (settings.LAZY_HOMEPAGE) ships a placeholder for each
+	below-the-fold section; each one is swapped for its /sections/<name>/
+	fragment as it nears the viewport. A link to an anchor that is not on the
+	page yet loads every section first.
+*/
+
+;(function (document, window) {
+    "use strict";
+
+    var placeholders = Array.prototype.slice.call(document.querySelectorAll('.lazy-section[data-section-url]'));
+    var observer = null;
+
+    function load(placeholder) {
+        if (!placeholder.loading) {
+            placeholder.loading = fetch(placeholder.getAttribute('data-section-url'), {credentials: 'same-origin'})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                if (observer) {
+                    observer.unobserve(placeholder);
+                }
+                // Unlike innerHTML, a contextual fragment runs the section's scripts
+                var fragment = document.createRange().createContextualFragment(html);
+                placeholder.parentNode.replaceChild(fragment, placeholder);
+            })
+            .catch(function (error) {
+                // Try again next time the placeholder comes into view
+                placeholder.loading = null;
+                console.log('Could not load section:', error);
+            });
+        }
+        return placeholder.loading;
+    }
+
+    function loadAll() {
+        return Promise.all(placeholders.map(load));
+    }
+
+    function reveal(hash) {
+        var id = decodeURIComponent(hash.slice(1));
+        if (!id || document.getElementById(id)) {
+            return;
+        }
+        loadAll().then(function () {
+            var target = document.getElementById(id);
+            if (target) {
+                target.scrollIntoView();
+            }
+        });
+    }
+
+    if ('IntersectionObserver' in window) {
+        observer = new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    load(entry.target);
+                }
+            });
+        }, {rootMargin: '300px 0px'});
+        placeholders.forEach(function (placeholder) {
+            observer.observe(placeholder);
+        });
+    } else {
+        loadAll();
+    }
+
+    document.addEventListener('click', function (e) {
+        var link = e.target.closest ? e.target.closest('a[href^="#"]') : null;
+        if (link) {
+            reveal(link.getAttribute('href'));
+        }
+    }, true);
+    window.addEventListener('hashchange', function () {
+        reveal(window.location.hash);
+    });
+    reveal(window.location.hash);
+})(document, window);